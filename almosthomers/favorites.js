@@ -5,12 +5,102 @@ function filterTeams() {
     teamSections.forEach(section => {
         if (selectedTeam === '' || section.getAttribute('data-team') === selectedTeam) {
             section.style.display = 'block';
+            if (selectedTeam !== '') {
+                loadTeamFragment(section);
+            }
         } else {
             section.style.display = 'none';
         }
     });
 }
 
+// Lazily loaded team sections: placeholders carry a data-fragment URL and are
+// swapped for the full section when scrolled into view or picked in the filter
+let teamFragmentObserver = null;
+
+function loadTeamFragment(section) {
+    const url = section.getAttribute('data-fragment');
+    if (!url || section.dataset.loading) {
+        return;
+    }
+    section.dataset.loading = 'true';
+    if (teamFragmentObserver) {
+        teamFragmentObserver.unobserve(section);
+    }
+
+    fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Failed to load ${url}: ${response.status}`);
+            }
+            return response.text();
+        })
+        .then(html => {
+            const container = document.createElement('div');
+            container.innerHTML = html.trim();
+            const loaded = container.firstElementChild;
+            loaded.style.display = section.style.display;
+            section.replaceWith(loaded);
+        })
+        .catch(error => {
+            console.error(error);
+            delete section.dataset.loading;
+        });
+}
+
+function observeTeamFragments() {
+    const placeholders = document.querySelectorAll('.team-section[data-fragment]');
+    if (!('IntersectionObserver' in window)) {
+        placeholders.forEach(loadTeamFragment);
+        return;
+    }
+
+    teamFragmentObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadTeamFragment(entry.target);
+            }
+        });
+    }, { rootMargin: '300px' });
+    placeholders.forEach(placeholder => teamFragmentObserver.observe(placeholder));
+}
+
+// Paged team tables: rows beyond a section's budget live in pages/<TEAM>/<n>.html
+// and are appended to the table one page per click
+function loadMoreRows(button) {
+    if (button.dataset.loading) {
+        return;
+    }
+    const page = Number(button.dataset.nextPage);
+    const url = `${button.dataset.pageUrl}${page}.html`;
+    button.dataset.loading = 'true';
+
+    fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Failed to load ${url}: ${response.status}`);
+            }
+            return response.text();
+        })
+        .then(html => {
+            button.closest('.team-section').querySelector('tbody').insertAdjacentHTML('beforeend', html);
+            advanceMoreRowsButton(button, page);
+        })
+        .catch(error => console.error(error))
+        .finally(() => delete button.dataset.loading);
+}
+
+function advanceMoreRowsButton(button, page) {
+    const remaining = Number(button.dataset.remaining) - Number(button.dataset.pageSize);
+    if (page >= Number(button.dataset.pageCount) || remaining <= 0) {
+        button.remove();
+        return;
+    }
+    button.dataset.nextPage = page + 1;
+    button.dataset.remaining = remaining;
+    button.textContent = `Show more (${remaining} remaining)`;
+}
+
 // Favorites functionality
 let favorites = JSON.parse(localStorage.getItem('baseballFavorites') || '[]');
 
@@ -99,6 +189,7 @@ function renderFavorites() {
 // Initialize favorites on page load
 document.addEventListener('DOMContentLoaded', function() {
     renderFavorites();
+    observeTeamFragments();
     
     // Update heart buttons based on saved favorites
     favorites.forEach(fav => {
@@ -0,0 +1,57 @@
+// Live leaderboard updates: applies the diffs streamed by /api/v1/events in place
+
+function leaderboardRowKeys(tbody) {
+    // Same keys as sections.keyed_rows: player name plus #n for the player's nth row
+    const seen = {};
+    const rows = {};
+    Array.from(tbody.rows).forEach(row => {
+        const button = row.querySelector('.heart-btn');
+        if (!button) {
+            rows[''] = row;
+            return;
+        }
+        const name = button.dataset.player;
+        seen[name] = name in seen ? seen[name] + 1 : 0;
+        rows[`${name}#${seen[name]}`] = row;
+    });
+    return rows;
+}
+
+function applyLeaderboardDiff(diff) {
+    const template = document.createElement('template');
+    Object.entries(diff.sections).forEach(([section, change]) => {
+        const tbody = document.querySelector(`tbody[data-rows="${section}"]`);
+        if (!tbody) {
+            return;
+        }
+        const existing = leaderboardRowKeys(tbody);
+        const rows = change.order.map(key => {
+            if (!(key in change.rows)) {
+                return existing[key];
+            }
+            template.innerHTML = change.rows[key].trim();
+            const row = template.content.firstElementChild;
+            row.classList.add('live-updated');
+            return row;
+        });
+        tbody.replaceChildren(...rows.filter(Boolean));
+    });
+
+    // New rows start with empty hearts
+    favorites.forEach(fav => updateHeartButtons(fav.name, true));
+}
+
+function startLiveUpdates() {
+    const version = document.querySelector('meta[name="build-fingerprint"]');
+    if (!window.EventSource || !version || !document.querySelector('tbody[data-rows="rolling"]')) {
+        return;
+    }
+    const source = new EventSource(`api/v1/events?since=${encodeURIComponent(version.content)}`);
+    source.addEventListener('leaderboards', event => applyLeaderboardDiff(JSON.parse(event.data)));
+}
+
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', startLiveUpdates);
+} else {
+    startLiveUpdates();
+}
@@ -0,0 +1,236 @@
+// Client-side table rendering for the bundle output mode.
+// Fetches the columnar data.json written by the build and fills the page's
+// empty tables with the same markup the server renders in inline mode.
+
+function logoUrl(team) {
+    return `https://a.espncdn.com/i/teamlogos/mlb/500/${team.toLowerCase()}.png`;
+}
+
+// Match Python's float formatting (104.0 rather than 104)
+function formatFloat(value) {
+    return Number.isInteger(value) ? value.toFixed(1) : String(value);
+}
+
+function formatEvent(event) {
+    if (!event || event === 'nan') {
+        return 'In Play';
+    }
+    return event.split('_').map(word => word.charAt(0).toUpperCase() + word.slice(1).toLowerCase()).join(' ');
+}
+
+function exitVeloStyle(velo) {
+    if (velo > 98) {
+        return 'background-color: #8B0000; color: #FFD700; font-weight: bold; box-shadow: 0 0 10px #FFD700; border: 2px solid #FFD700';
+    } else if (velo > 94) {
+        return 'background-color: #FF0000';
+    }
+    return 'background-color: #FFB6C1';
+}
+
+function launchAngleStyle(angle, barrel) {
+    if (barrel) {
+        return 'background-color: #FF6B35';
+    } else if (angle >= 31 && angle <= 35) {
+        return 'background-color: #006400';
+    } else if (angle >= 20 && angle <= 30) {
+        return 'background-color: #00FF00';
+    } else if (angle >= 14 && angle <= 19) {
+        return 'background-color: #90EE90';
+    } else if (angle >= 8 && angle <= 13) {
+        return 'background-color: #FFFF00';
+    }
+    return 'background-color: #FF0000';
+}
+
+function eventRowStyle(event) {
+    if (event === 'triple') {
+        return ['style="background-color: rgba(0, 255, 0, 0.2); border-left: 3px solid #00FF00;"', '⭐ '];
+    } else if (event === 'double') {
+        return ['style="background-color: rgba(0, 200, 0, 0.2); border-left: 3px solid #00AA00;"', '⭐ '];
+    } else if (event === 'single') {
+        return ['style="background-color: rgba(255, 255, 0, 0.2); border-left: 3px solid #FFFF00;"', ''];
+    }
+    return ['', ''];
+}
+
+function playerCells(data, playerIndex) {
+    const name = data.players.name[playerIndex];
+    const team = data.teams[data.players.team[playerIndex]];
+    const logo = `<img src="${logoUrl(team)}" width="20" style="vertical-align:middle; margin-right: 8px;">`;
+    return `<td data-label="♥" style="text-align: center;"><button class="heart-btn" data-player="${name}" data-logo="${logo.replace(/"/g, '&quot;')}" onclick="toggleFavoriteBtn(this)">♡</button></td>
+                            <td data-label="Player"><div class="batter-cell">${logo}<span class="leaderboard-player-name">${name}</span></div></td>`;
+}
+
+function renderRollingRows(data) {
+    const rows = data.rolling;
+    return rows.player.map((player, i) => {
+        const event = data.events[rows.best_event[i]];
+        const [rowStyle, star] = eventRowStyle(event);
+        return `
+                        <tr ${rowStyle}>
+                            ${playerCells(data, player)}
+                            <td data-label="# Times Elite Contact" style="text-align: center; font-weight: bold; color: #4CAF50;">${rows.total_count[i]}</td>
+                            <td data-label="Best Exit Velo" style="text-align: center; ${exitVeloStyle(rows.best_exit_velo[i])}">${formatFloat(rows.best_exit_velo[i])} mph</td>
+                            <td data-label="Best Distance" style="text-align: center;">${Math.trunc(rows.best_distance[i])} ft</td>
+                            <td data-label="Best Event" style="text-align: center;">${star}${formatEvent(event)}</td>
+                            <td data-label="Days Active" style="text-align: center; color: #FFA500;">${rows.days_active[i]}</td>
+                        </tr>`;
+    }).join('');
+}
+
+function renderHitterRows(data, rows) {
+    if (rows.player.length === 0) {
+        return '<tr><td colspan="5" style="text-align: center; color: #7f8c8d; font-style: italic; padding: 20px;">No elite contact hits found for this date</td></tr>';
+    }
+    return rows.player.map((player, i) => {
+        const event = data.events[rows.event[i]];
+        const [rowStyle, star] = eventRowStyle(event);
+        return `
+                        <tr ${rowStyle}>
+                            ${playerCells(data, player)}
+                            <td data-label="Exit Velo" style="text-align: center; ${exitVeloStyle(rows.exit_velo[i])}">${formatFloat(rows.exit_velo[i])} mph</td>
+                            <td data-label="Distance" style="text-align: center;">${Math.trunc(rows.distance[i])} ft</td>
+                            <td data-label="Event" style="text-align: center;">${star}${formatEvent(event)}</td>
+                        </tr>`;
+    }).join('');
+}
+
+function renderTeamRows(data, start, end) {
+    const hits = data.hits;
+    let rows = '';
+    for (let i = start; i < end; i++) {
+        const name = data.players.name[hits.player[i]];
+        const team = data.teams[data.players.team[hits.player[i]]];
+        const batSpeed = hits.bat_speed[i] === null ? 'N/A' : formatFloat(hits.bat_speed[i]);
+        rows += `
+                        <tr>
+                            <td data-label="Batter"><div class="batter-cell"><img src="${logoUrl(team)}" width="24" style="vertical-align:middle"> <span class="player-name">${name}</span></div></td>
+                            <td data-label="Exit Velo"><div class="exit-velo" style="${exitVeloStyle(hits.exit_velo[i])}">${formatFloat(hits.exit_velo[i])}</div></td>
+                            <td data-label="Launch Angle"><div class="launch-angle" style="${launchAngleStyle(hits.launch_angle[i], hits.barrel[i])}">${formatFloat(hits.launch_angle[i])}°</div></td>
+                            <td data-label="Bat Speed"><div class="bat-speed-cell">${batSpeed}</div></td>
+                            <td data-label="Barrel"><div class="barrel-cell">${hits.barrel[i] ? '🛢️' : ''}</div></td>
+                            <td data-label="HR/Park"><div class="hr-prob-cell">0/30</div></td>
+                            <td data-label="Distance"><div class="distance-cell">${formatFloat(hits.distance[i])} ft</div></td>
+                            <td data-label="Event"><div class="event-cell">${formatEvent(data.events[hits.event[i]])}</div></td>
+                        </tr>`;
+    }
+    return rows;
+}
+
+// Rows beyond a team's budget stay in data.json until "Show more" is clicked
+function moreRowsButton(start, end, pageSize) {
+    if (start >= end) {
+        return '';
+    }
+    return `
+    <button class="load-more-rows" data-start="${start}" data-end="${end}" data-page-size="${pageSize}" onclick="renderMoreRows(this)">Show more (${end - start} remaining)</button>`;
+}
+
+function renderMoreRows(button) {
+    const start = Number(button.dataset.start);
+    const end = Number(button.dataset.end);
+    const pageSize = Number(button.dataset.pageSize);
+    const stop = Math.min(end, start + pageSize);
+    button.closest('.team-section').querySelector('tbody').insertAdjacentHTML('beforeend', renderTeamRows(bundleData, start, stop));
+    if (stop >= end) {
+        button.remove();
+        return;
+    }
+    button.dataset.start = stop;
+    button.textContent = `Show more (${end - stop} remaining)`;
+}
+
+function renderTeamSection(data, teamIndex, rows, moreRows) {
+    const stats = data.team_stats;
+    const team = data.teams[stats.team[teamIndex]];
+    return `<div class="team-section" data-team="${team}">
+    <div class="team-header">
+        <div class="team-name">${team}</div>
+        <div class="team-stats">
+            <div class="stat-item">
+                <div class="stat-value">${stats.count[teamIndex]}</div>
+                <div class="stat-label">Almost HRs</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${stats.avg_distance[teamIndex]} ft</div>
+                <div class="stat-label">Avg Distance</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${stats.max_distance[teamIndex]} ft</div>
+                <div class="stat-label">Longest</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">${stats.avg_exit_velo[teamIndex]}</div>
+                <div class="stat-label">Avg Exit Velo</div>
+            </div>
+        </div>
+    </div>
+    <table>
+        <thead>
+            <tr>
+                <th>Batter</th>
+                <th>Exit Velo</th>
+                <th>Launch Angle</th>
+                <th>Bat Speed</th>
+                <th>Barrel</th>
+                <th>HR/Park</th>
+                <th>Distance</th>
+                <th>Event</th>
+            </tr>
+        </thead>
+        <tbody>${rows}
+        </tbody>
+    </table>${moreRows}
+</div>`;
+}
+
+let bundleData = null;
+
+function renderBundle(data) {
+    bundleData = data;
+    const fill = (key, html) => {
+        const tbody = document.querySelector(`tbody[data-rows="${key}"]`);
+        if (tbody) {
+            tbody.innerHTML = html;
+        }
+    };
+    fill('rolling', renderRollingRows(data));
+    fill('today', renderHitterRows(data, data.today));
+    fill('yesterday', renderHitterRows(data, data.yesterday));
+
+    const filter = document.getElementById('teamFilter');
+    const sections = [];
+    let start = 0;
+    data.team_stats.team.forEach((teamId, i) => {
+        const team = data.teams[teamId];
+        const end = start + data.team_stats.count[i];
+        const budget = data.team_stats.row_budget[i];
+        const inlineEnd = budget ? Math.min(end, start + budget) : end;
+        sections.push(renderTeamSection(data, i, renderTeamRows(data, start, inlineEnd), moreRowsButton(inlineEnd, end, budget)));
+        filter.insertAdjacentHTML('beforeend', `<option value="${team}">${team}</option>`);
+        start = end;
+    });
+    document.querySelector('.team-tables').innerHTML = sections.join('');
+
+    // Rows didn't exist when favorites.js initialised the heart buttons
+    favorites.forEach(fav => updateHeartButtons(fav.name, true));
+}
+
+function loadBundle() {
+    const url = 'data.json';
+    fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Failed to load ${url}: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(renderBundle)
+        .catch(error => console.error(error));
+}
+
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', loadBundle);
+} else {
+    loadBundle();
+}
@@ -0,0 +1,220 @@
+"""In-memory indexes behind the /api/v1 query endpoints.
+
+The build writes the query data next to the pages: <site>/YYYY-MM-DD/hits.json
+for every archived day, <site>/rolling.json with a rolling leaderboard per
+window and <site>/season.json with the season-to-date leaderboard. They are loaded once per build into lookup tables (date/team -> rows
+in exit velo order, player -> rows), so a query is a dictionary lookup plus a
+binary search instead of a scan.
+
+Each index also holds a response cache: the serialized answers to the
+queries clients repeat, keyed by the normalized query. It lives and dies with
+its build's index, so swapping a new build in replaces both at once and a
+response can never come from a different build than the index.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+from archive import SITE_DIR, ARCHIVE_MANIFEST_NAME, archive_day_dir, is_archive_date, load_archive_manifest
+from build_report import BUILD_REPORT_NAME
+
+HITS_FILE_NAME = "hits.json"
+ROLLING_FILE_NAME = "rolling.json"
+SEASON_FILE_NAME = "season.json"
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# Bounds of each build's response cache
+API_CACHE_ENTRIES = int(os.environ.get('ALMOSTHOMERS_API_CACHE_ENTRIES', '1024'))
+API_CACHE_BYTES = int(os.environ.get('ALMOSTHOMERS_API_CACHE_BYTES', str(16 * 1024 * 1024)))
+
+
+class ApiQueryError(ValueError):
+    """A query parameter that can't be used; reported to the client as a 400"""
+
+
+class ResponseCache:
+    """Serialized responses by query key, bounded in count and bytes, least recently used evicted first"""
+
+    def __init__(self, max_entries=API_CACHE_ENTRIES, max_bytes=API_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (body, status)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.inc('almosthomers_api_cache_lookups_total', result='miss' if entry is None else 'hit')
+        return entry
+
+    def put(self, key, body, status):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            replaced = self._entries.pop(key, None)
+            if replaced is not None:
+                self.size -= len(replaced[0])
+            self._entries[key] = (body, status)
+            self.size += len(body)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class ApiIndex:
+    """Query tables over one build's hits and rolling leaderboards"""
+
+    def __init__(self, site_dir):
+        self.days = sorted(load_archive_manifest(site_dir))
+        # (date or None, team or None) -> (rows by descending exit velo, their negated exit velos)
+        self.hits = {}
+        self.players = {}
+        for date_str in self.days:
+            hits_file = os.path.join(archive_day_dir(date_str, site_dir), HITS_FILE_NAME)
+            if not os.path.exists(hits_file):
+                continue
+            with open(hits_file, 'r', encoding='utf-8') as f:
+                for row in json.load(f):
+                    row['date'] = date_str
+                    for key in ((date_str, row['team']), (date_str, None), (None, row['team']), (None, None)):
+                        self.hits.setdefault(key, []).append(row)
+                    if row['player_id'] is not None:
+                        self.players.setdefault(row['player_id'], []).append(row)
+        for key, rows in self.hits.items():
+            rows.sort(key=lambda row: row['exit_velo'], reverse=True)
+            self.hits[key] = (rows, [-row['exit_velo'] for row in rows])
+        self.hit_count = len(self.hits.get((None, None), ([], []))[0])
+        for rows in self.players.values():
+            rows.sort(key=lambda row: (row['date'], row['exit_velo']), reverse=True)
+
+        rolling_file = os.path.join(site_dir, ROLLING_FILE_NAME)
+        rolling = {'days': [], 'windows': {}}
+        if os.path.exists(rolling_file):
+            with open(rolling_file, 'r', encoding='utf-8') as f:
+                rolling = json.load(f)
+        self.rolling_days = rolling['days']
+        self.rolling = {int(window): board for window, board in rolling['windows'].items()}
+        widest = self.rolling.get(len(self.rolling_days), [])
+        self.rolling_by_player = {row['player_id']: row for row in widest if row['player_id'] is not None}
+
+        season_file = os.path.join(site_dir, SEASON_FILE_NAME)
+        self.season = {'season': None, 'days': [], 'leaderboard': []}
+        if os.path.exists(season_file):
+            with open(season_file, 'r', encoding='utf-8') as f:
+                self.season = json.load(f)
+        self.responses = ResponseCache()
+
+    def normalize_hits_query(self, date=None, team=None):
+        """The (date, team) a hits query asks for: date defaults to the latest day, 'all' is every day"""
+        if date is None:
+            date = self.days[-1] if self.days else 'all'
+        elif date != 'all' and not is_archive_date(date):
+            raise ApiQueryError("date must be YYYY-MM-DD or 'all'")
+        return date, team.upper() if team else None
+
+    def query_hits(self, date=None, team=None, min_ev=None, limit=DEFAULT_LIMIT):
+        """Hits of one day (default: the latest) or all days, optionally for one team, hardest first"""
+        date, team = self.normalize_hits_query(date, team)
+        date = None if date == 'all' else date
+        rows, negated_velos = self.hits.get((date, team), ([], []))
+        count = len(rows) if min_ev is None else bisect.bisect_right(negated_velos, -min_ev)
+        return {'date': date, 'team': team, 'min_ev': min_ev, 'count': count, 'hits': rows[:min(count, limit)]}
+
+    def query_rolling(self, window=None):
+        """Rolling leaderboard over the last window recorded days (default: all of them)"""
+        days = len(self.rolling_days)
+        window = days if window is None else window
+        if days and not 1 <= window <= days:
+            raise ApiQueryError(f"window must be between 1 and {days}")
+        return {'window': window, 'days': self.rolling_days[days - window:], 'leaderboard': self.rolling.get(window, [])}
+
+    def query_season(self, limit=DEFAULT_LIMIT):
+        """Season-to-date leaderboard over the days recorded in the season matrices"""
+        return {
+            'season': self.season['season'],
+            'days': len(self.season['days']),
+            'first_day': self.season['days'][0] if self.season['days'] else None,
+            'last_day': self.season['days'][-1] if self.season['days'] else None,
+            'count': len(self.season['leaderboard']),
+            'leaderboard': self.season['leaderboard'][:limit]
+        }
+
+    def query_player(self, player_id):
+        """A player's hits across the archived days, newest first (None if there are none)"""
+        rows = self.players.get(player_id)
+        if rows is None and player_id not in self.rolling_by_player:
+            return None
+        rows = rows or []
+        latest = rows[0] if rows else self.rolling_by_player[player_id]
+        return {
+            'player_id': player_id,
+            'player': latest['player'],
+            'team': latest['team'],
+            'hits': rows,
+            'rolling': self.rolling_by_player.get(player_id)
+        }
+
+
+_lock = threading.Lock()
+_index = None
+_index_key = None
+
+
+def _index_signature(site_dir):
+    """Artifact builds never change once served; only the almosthomers/ fallback is rechecked
+
+    Every build rewrites build.json, so its mtime also catches hits.json files
+    corrected in place, which leave archive.json untouched. The other files
+    cover a checkout without build.json.
+    """
+    if site_dir != SITE_DIR:
+        return site_dir
+    stamps = []
+    for name in (BUILD_REPORT_NAME, ARCHIVE_MANIFEST_NAME, ROLLING_FILE_NAME, SEASON_FILE_NAME):
+        try:
+            stamps.append(os.stat(os.path.join(site_dir, name)).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return site_dir, tuple(stamps)
+
+
+def get_api_index(site_dir):
+    """The ApiIndex of site_dir, loading it when the served build changes"""
+    global _index, _index_key
+    key = _index_signature(site_dir)
+    with _lock:
+        if key != _index_key:
+            _index = ApiIndex(site_dir)
+            _index_key = key
+        return _index
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiQueryError("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiQueryError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def parse_number(name, value, kind=float):
+    if value is None or value == '':
+        return None
+    try:
+        number = kind(value)
+    except ValueError:
+        raise ApiQueryError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ApiQueryError(f"{name} must be a number")
+    return number
@@ -0,0 +1,67 @@
+"""Static per-date archive: <site>/YYYY-MM-DD/index.html plus <site>/archive.html.
+
+Every processed day gets its own page that never changes unless that day's
+data (or the code/templates that render it) changes. archive.json records a
+small summary of each archived day so the index page can be rebuilt without
+reading the day pages back.
+"""
+import json
+import os
+import re
+from datetime import datetime
+
+from storage import atomic_write
+from templates import load_component, iter_render
+
+SITE_DIR = "../almosthomers"
+ARCHIVE_MANIFEST_NAME = "archive.json"
+ARCHIVE_INDEX_NAME = "archive.html"
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def is_archive_date(name):
+    """Whether name looks like an archive day directory (YYYY-MM-DD)"""
+    return bool(DATE_RE.match(name))
+
+
+def archive_day_dir(date_str, site_dir=SITE_DIR):
+    """Output directory of one archived day"""
+    return os.path.join(site_dir, date_str)
+
+
+def format_archive_date(date_str):
+    """2025-06-01 -> June 01, 2025"""
+    return datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')
+
+
+def load_archive_manifest(site_dir=SITE_DIR):
+    """Load {date: {'hits': n, 'teams': n}} for every archived day"""
+    manifest_file = os.path.join(site_dir, ARCHIVE_MANIFEST_NAME)
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_archive_manifest(manifest, site_dir=SITE_DIR):
+    atomic_write(os.path.join(site_dir, ARCHIVE_MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def iter_archive_rows(manifest):
+    """Yield the index rows, newest day first"""
+    for date_str in sorted(manifest, reverse=True):
+        day = manifest[date_str]
+        yield f"""
+                        <tr>
+                            <td data-label="Date"><a class="archive-link" href="{date_str}/">{format_archive_date(date_str)}</a></td>
+                            <td data-label="Almost HRs">{day['hits']}</td>
+                            <td data-label="Teams">{day['teams']}</td>
+                        </tr>"""
+
+
+def iter_archive_index(manifest, styles_url):
+    """Yield the archive index page"""
+    yield from iter_render(load_component('archive_index.html'),
+        styles_url=styles_url,
+        archive_rows=iter_archive_rows(manifest)
+    )
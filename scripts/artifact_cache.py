@@ -0,0 +1,104 @@
+"""In-memory copies of the served build's files with strong validators.
+
+Each file is read once, together with its precompressed siblings, and kept as
+bytes with an ETag (sha256 of the plain bytes) and Last-Modified, so a hot
+page is answered from memory and conditional requests get a 304. Artifact
+builds never change after they are swapped in, so the cache is simply
+dropped when the served directory changes. Only the almosthomers/ fallback,
+which `build` may rewrite in place, and build.json, which a refresh that
+changed nothing replaces in the current build, are checked against the
+file's mtime.
+"""
+import hashlib
+import os
+import stat
+import threading
+from datetime import datetime, timezone
+
+import metrics
+from artifacts import SITE_DIR
+from build_report import BUILD_REPORT_NAME
+
+# Larger files are streamed from disk instead of being held in memory
+MAX_CACHED_FILE = int(os.environ.get('ALMOSTHOMERS_CACHE_MAX_FILE_BYTES', str(8 * 1024 * 1024)))
+# What every visitor loads; archive days are left to be cached on first request
+HOT_FILES = ('index.html', 'archive.html', 'data.json', 'styles.css', 'favorites.js', 'render.js', 'live.js',
+             'leaderboards.json')
+HOT_DIRS = ('static', 'teams', 'pages')
+
+_lock = threading.Lock()
+_site_dir = None
+_entries = {}
+
+
+class CachedArtifact:
+    """One served file: {suffix: bytes} for '' and each precompressed sibling"""
+
+    def __init__(self, bodies, etag, last_modified, mtime_ns):
+        self.bodies = bodies
+        self.etag = etag
+        self.last_modified = last_modified
+        self.mtime_ns = mtime_ns
+
+    def etag_for(self, suffix):
+        """Strong ETag of one representation (each encoding needs its own)"""
+        return f"{self.etag}{suffix.replace('.', '-')}"
+
+
+def _load(path):
+    info = os.stat(path)
+    if not stat.S_ISREG(info.st_mode):
+        raise IsADirectoryError(path)
+    if info.st_size > MAX_CACHED_FILE:
+        return None
+    with open(path, 'rb') as f:
+        plain = f.read()
+    bodies = {'': plain}
+    for suffix in ('.br', '.gz'):
+        if os.path.exists(path + suffix):
+            with open(path + suffix, 'rb') as f:
+                bodies[suffix] = f.read()
+    return CachedArtifact(
+        bodies,
+        hashlib.sha256(plain).hexdigest()[:32],
+        datetime.fromtimestamp(info.st_mtime, timezone.utc),
+        info.st_mtime_ns,
+    )
+
+
+def get_artifact(site_dir, path):
+    """Cached contents of path (inside site_dir), or None if it is too large to cache
+
+    Raises FileNotFoundError when path doesn't exist (IsADirectoryError for directories).
+    """
+    global _site_dir
+    with _lock:
+        if site_dir != _site_dir:
+            _entries.clear()
+            _site_dir = site_dir
+        entry = _entries.get(path)
+    rewritable = site_dir == SITE_DIR or os.path.basename(path) == BUILD_REPORT_NAME
+    if entry is not None and rewritable and os.stat(path).st_mtime_ns != entry.mtime_ns:
+        entry = None
+    metrics.inc('almosthomers_artifact_cache_lookups_total', result='miss' if entry is None else 'hit')
+    if entry is None:
+        entry = _load(path)
+        if entry is not None:
+            with _lock:
+                if _site_dir == site_dir:
+                    _entries[path] = entry
+    return entry
+
+
+def warm_artifact_cache(site_dir):
+    """Load site_dir's hot files ahead of the first request"""
+    paths = [os.path.join(site_dir, name) for name in HOT_FILES]
+    for directory in HOT_DIRS:
+        for root, _, files in os.walk(os.path.join(site_dir, directory)):
+            paths.extend(os.path.join(root, name) for name in files if not name.endswith(('.br', '.gz')))
+    for path in paths:
+        try:
+            get_artifact(site_dir, path)
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+    return len(_entries)
@@ -0,0 +1,203 @@
+"""Versioned site builds for the server, swapped in atomically.
+
+Background refreshes never write into the directory being served. Each one
+builds a complete site in data/artifacts/<build id>/ and then repoints the
+data/artifacts/current symlink at it with a single rename, so every request
+sees either the previous build or the new one, never a half-written mix.
+Until the first refresh finishes the server falls back to almosthomers/.
+"""
+import filecmp
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from build_report import BUILD_REPORT_NAME
+from single_flight import SingleFlight
+from storage import file_lock
+
+SITE_DIR = "../almosthomers"
+ARTIFACTS_DIR = "../data/artifacts"
+CURRENT_LINK = os.path.join(ARTIFACTS_DIR, "current")
+KEEP_ARTIFACTS = 3
+REFRESH_INTERVAL = int(os.environ.get('ALMOSTHOMERS_REFRESH_INTERVAL', '3600'))
+# Seconds a refresh trigger waits for more triggers before building
+REFRESH_DEBOUNCE = float(os.environ.get('ALMOSTHOMERS_REFRESH_DEBOUNCE', '5'))
+# Shared by every serving process so only one of them refreshes at a time
+REFRESH_LOCK = os.path.join(ARTIFACTS_DIR, "refresh.lock")
+REFRESH_STAMP = os.path.join(ARTIFACTS_DIR, "refresh.stamp")
+# Held for life by the one process whose scheduler runs
+SCHEDULER_LOCK = os.path.join(ARTIFACTS_DIR, "scheduler.lock")
+
+# Pipeline state that lives next to the pages in almosthomers/ but isn't part of a build
+SEED_IGNORE = shutil.ignore_patterns('*.lock', '*.tmp', 'elite_contact_history.json')
+
+
+def current_site_dir():
+    """Directory requests are served from: the current artifact, else almosthomers/"""
+    try:
+        return os.path.join(ARTIFACTS_DIR, os.readlink(CURRENT_LINK))
+    except OSError:
+        return SITE_DIR
+
+
+def _link_or_copy(src, dst):
+    """Hard-link unchanged files into the new build, copying across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def new_artifact_dir():
+    """Create a build directory seeded with the current site
+
+    Seeding keeps the build incremental (unchanged pages, archive days and
+    precompressed files are reused). Files are hard links, which is safe
+    because the build only ever replaces files and never writes into them.
+    """
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    build_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    path = os.path.join(ARTIFACTS_DIR, build_id)
+    seed = current_site_dir()
+    if os.path.isdir(seed):
+        shutil.copytree(seed, path, copy_function=_link_or_copy, ignore=SEED_IGNORE)
+    else:
+        os.makedirs(path)
+    return path
+
+
+def swap_in(artifact_dir):
+    """Atomically point the current symlink at artifact_dir"""
+    tmp_link = f"{CURRENT_LINK}.{os.getpid()}.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.basename(artifact_dir), tmp_link)
+    os.replace(tmp_link, CURRENT_LINK)
+
+
+def prune_artifacts(keep=KEEP_ARTIFACTS):
+    """Delete all but the newest keep builds, never the current one
+
+    Older builds are kept for a while so requests that resolved them just
+    before a swap can still finish reading.
+    """
+    current = os.path.basename(current_site_dir())
+    builds = sorted(
+        entry.name for entry in os.scandir(ARTIFACTS_DIR)
+        if entry.is_dir(follow_symlinks=False) and entry.name != current
+    )
+    for name in builds[:max(len(builds) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(ARTIFACTS_DIR, name), ignore_errors=True)
+
+
+def _site_files(site_dir):
+    files = set()
+    for root, _, names in os.walk(site_dir):
+        files.update(os.path.relpath(os.path.join(root, name), site_dir) for name in names)
+    files.discard(BUILD_REPORT_NAME)
+    return files
+
+
+def same_build(new_dir, current_dir):
+    """Whether new_dir serves exactly what current_dir does, apart from its build report
+
+    Files the build didn't rewrite are still hard links into the current
+    build, so most comparisons stop at the inode.
+    """
+    files = _site_files(new_dir)
+    if files != _site_files(current_dir):
+        return False
+    for name in files:
+        new, current = os.path.join(new_dir, name), os.path.join(current_dir, name)
+        if not os.path.samefile(new, current) and not filecmp.cmp(new, current, shallow=False):
+            return False
+    return True
+
+
+def build_artifact():
+    """Build the site into a fresh artifact directory and swap it in; None when nothing changed
+
+    A build identical to the current one is dropped rather than swapped in,
+    so workers keep their warm caches. Only its build.json is kept, moved
+    into the current build, so the fetch and build times stay accurate.
+    """
+    from pipeline import build  # heavy imports, only needed once a refresh actually runs
+
+    path = new_artifact_dir()
+    try:
+        build(output_dir=path)
+    except BaseException:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    current = current_site_dir()
+    if current != SITE_DIR and same_build(path, current):
+        os.replace(os.path.join(path, BUILD_REPORT_NAME), os.path.join(current, BUILD_REPORT_NAME))
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"Refresh: nothing changed, still serving {current}")
+        return None
+    swap_in(path)
+    prune_artifacts()
+    print(f"Refresh: now serving {path}")
+    return path
+
+
+def seconds_since_refresh():
+    """Seconds since any process last started a refresh (inf if none ever has)"""
+    try:
+        return time.time() - os.stat(REFRESH_STAMP).st_mtime
+    except OSError:
+        return float('inf')
+
+
+def _stamp_refresh():
+    with open(REFRESH_STAMP, 'a'):
+        pass
+    os.utime(REFRESH_STAMP)
+
+
+def _refresh():
+    _stamp_refresh()
+    if build_artifact() is not None and _on_swap is not None:
+        _on_swap()
+
+
+_on_swap = None
+refresher = SingleFlight('Refresh', _refresh, REFRESH_LOCK, REFRESH_DEBOUNCE)
+
+
+def request_refresh(reason):
+    """Trigger a background refresh, coalesced with any pending or running one; see refresher.trigger"""
+    return refresher.trigger(reason)
+
+
+def start_refresh_scheduler(interval=REFRESH_INTERVAL, on_swap=None):
+    """Rebuild on a daemon thread whenever interval seconds have passed since the last refresh (0 disables)
+
+    With several serving processes only the one holding SCHEDULER_LOCK runs
+    its schedule; the others wait on the lock and take over when that
+    process exits. The schedule itself is kept in REFRESH_STAMP, so it
+    survives restarts. Requests keep being served from the previous build
+    while a refresh runs, and on_swap is called after any refresh, scheduled
+    or requested, has swapped a new build in; refreshes that changed nothing
+    don't call it.
+    """
+    global _on_swap
+    _on_swap = on_swap
+    if interval <= 0:
+        return None
+
+    def refresh_loop():
+        with file_lock(SCHEDULER_LOCK):
+            while True:
+                wait = interval - seconds_since_refresh()
+                if wait > 0:
+                    time.sleep(wait)
+                    continue
+                ticket, _ = request_refresh("schedule")
+                refresher.wait(ticket)
+
+    thread = threading.Thread(target=refresh_loop, name='refresh-scheduler', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,79 @@
+"""Content-hashed copies of the static assets.
+
+Each asset is published as name.<hash>.ext under almosthomers/static, so its
+URL changes whenever its contents do and browsers can cache it forever. The
+manifest maps logical names (styles.css) to the published paths
+(static/styles.3f2a9c1d04b7.css) for the page templates. It changes with
+every asset update, so it lives next to the pages rather than in static/,
+which is served as immutable.
+"""
+import hashlib
+import json
+import os
+
+from compression import precompress
+from storage import atomic_write
+
+SITE_DIR = "../almosthomers"
+MANIFEST_NAME = "asset-manifest.json"
+# Where builds before the manifest moved out of static/ wrote it
+LEGACY_MANIFEST = os.path.join("static", "manifest.json")
+HASH_LENGTH = 12
+
+# Logical name -> source file
+ASSET_SOURCES = {
+    'styles.css': '../assets/css/styles.css',
+    'favorites.js': '../assets/js/favorites.js',
+    'render.js': '../assets/js/render.js',
+    'live.js': '../assets/js/live.js',
+}
+
+
+def hashed_name(filename, data):
+    """styles.css + contents -> styles.<hash>.css"""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def load_manifest(site_dir):
+    """Load the manifest of the last build, or {} if there is none"""
+    for name in (MANIFEST_NAME, LEGACY_MANIFEST):
+        manifest_file = os.path.join(site_dir, name)
+        if os.path.exists(manifest_file):
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return {}
+
+
+def publish_assets(sources=ASSET_SOURCES, site_dir=SITE_DIR):
+    """Copy each asset to its hashed name under site_dir/static and return the new manifest
+
+    Files are only written when their hashed name doesn't exist yet. Assets of
+    the previous build are kept so pages that are still cached can load them;
+    anything older is removed.
+    """
+    static_dir = os.path.join(site_dir, "static")
+    os.makedirs(static_dir, exist_ok=True)
+    previous = load_manifest(site_dir)
+    manifest = {}
+    for logical_name, source in sources.items():
+        if not os.path.exists(source):
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        published_name = hashed_name(logical_name, data)
+        published_path = os.path.join(static_dir, published_name)
+        if not os.path.exists(published_path):
+            atomic_write(published_path, data, mode='wb')
+        precompress(published_path)
+        manifest[logical_name] = f"static/{published_name}"
+
+    manifest_file = os.path.join(site_dir, MANIFEST_NAME)
+    if manifest != previous or not os.path.exists(manifest_file):
+        atomic_write(manifest_file, json.dumps(manifest, indent=2, sort_keys=True))
+
+    keep = {os.path.basename(path) for path in list(manifest.values()) + list(previous.values())}
+    for name in os.listdir(static_dir):
+        if name not in keep and name.rsplit('.', 1)[0] not in keep:
+            os.remove(os.path.join(static_dir, name))
+    return manifest
@@ -0,0 +1,81 @@
+"""Build metadata written next to the pages as build.json.
+
+Records when the build finished, when Statcast was last fetched successfully
+and how long each stage took, so /api/v1/readyz can tell fresh data from
+stale and slow refreshes show up without reading the logs.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from storage import atomic_write
+
+BUILD_REPORT_NAME = "build.json"
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def seconds_since(timestamp):
+    """Seconds elapsed since an ISO timestamp written by utc_now"""
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(timestamp)).total_seconds()
+
+
+class StageTimer:
+    """Time a build as consecutive stages: lap(name) ends the stage that began at the previous lap"""
+
+    def __init__(self):
+        self.started_at = utc_now()
+        self.stages = {}
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = round(now - self._last, 3)
+        self._last = now
+
+    @contextmanager
+    def measure(self, stage):
+        """Time a step inside the current stage as a stage of its own"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] = round(self.stages.get(stage, 0) + time.perf_counter() - started, 3)
+
+    @property
+    def total(self):
+        return round(time.perf_counter() - self._started, 3)
+
+
+def directory_size(path):
+    """Bytes of all files under path"""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def write_build_report(site_dir, timer, fetched_at, rows_fetched, bytes_fetched, fragment_cache):
+    """Write build.json and return the report"""
+    report = {
+        'started_at': timer.started_at,
+        'finished_at': utc_now(),
+        'duration_seconds': timer.total,
+        'stages': timer.stages,
+        'fetched_at': fetched_at,
+        'rows_fetched': rows_fetched,
+        'bytes_fetched': bytes_fetched,
+        'fragment_cache': fragment_cache,
+        'artifact_bytes': directory_size(site_dir)
+    }
+    atomic_write(os.path.join(site_dir, BUILD_REPORT_NAME), json.dumps(report, indent=2))
+    return report
+
+
+def parse_build_report(raw):
+    """The report from build.json contents, or None if they can't be read"""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
@@ -0,0 +1,120 @@
+"""Compact columnar JSON bundle of the page data.
+
+Instead of shipping every row as styled HTML, the bundle output mode writes
+data.json (plus precompressed siblings) and lets assets/js/render.js build the
+tables in the browser. Tables are stored column-wise, and repeated strings
+(players, teams, events) are dictionary-encoded as indexes into shared lists.
+"""
+import json
+
+import pandas as pd
+
+from sections import is_barrel, order_individual_hits, parse_batter_key, iter_team_partitions
+
+BUNDLE_VERSION = 2
+
+
+class _Dictionary:
+    """Assign dense indexes to repeated values in first-seen order"""
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def __call__(self, value):
+        if value not in self.index:
+            self.index[value] = len(self.values)
+            self.values.append(value)
+        return self.index[value]
+
+
+def _number(value):
+    """Plain JSON number (or None for NaN) from a pandas/numpy scalar"""
+    if pd.isna(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def build_data_bundle(final, elite_leaderboard, elite_leaderboard_day_before, rolling_leaderboard, meta,
+                      row_budget=None):
+    """Build the columnar bundle for one page
+
+    Rows are pre-sorted and capped exactly like the HTML sections, so the
+    client renders them in order without re-implementing the ranking. Hits are
+    grouped by team in team_stats order; each team's rows are the next
+    team_stats['count'] entries, of which the client renders the first
+    team_stats['row_budget'] (0 = all) until more are requested. row_budget
+    maps a team to its budget.
+    """
+    teams = _Dictionary()
+    events = _Dictionary()
+    players = _Dictionary()
+    player_teams = []
+
+    def player(batter_with_logo):
+        name, team = parse_batter_key(str(batter_with_logo))
+        index = players((name, team))
+        if index == len(player_teams):
+            player_teams.append(teams(team))
+        return index
+
+    hits = {'player': [], 'exit_velo': [], 'launch_angle': [], 'bat_speed': [],
+            'distance': [], 'event': [], 'barrel': []}
+    team_stats = {'team': [], 'count': [], 'avg_distance': [], 'max_distance': [], 'avg_exit_velo': [],
+                  'row_budget': []}
+    for team, team_data in iter_team_partitions(final):
+        team_stats['team'].append(teams(team))
+        team_stats['count'].append(len(team_data))
+        team_stats['avg_distance'].append(f"{team_data['Distance (ft)'].mean():.0f}")
+        team_stats['max_distance'].append(f"{team_data['Distance (ft)'].max():.0f}")
+        team_stats['avg_exit_velo'].append(f"{team_data['Exit Velo'].mean():.1f}")
+        team_stats['row_budget'].append(row_budget(team) if row_budget else 0)
+
+        for row in team_data.sort_values('Exit Velo', ascending=False).to_dict('records'):
+            hits['player'].append(player(row['Batter']))
+            hits['exit_velo'].append(_number(row['Exit Velo']))
+            hits['launch_angle'].append(_number(row['Launch Angle']))
+            hits['bat_speed'].append(_number(row['Bat Speed']))
+            hits['distance'].append(_number(row['Distance (ft)']))
+            hits['event'].append(events(str(row['Event'])))
+            hits['barrel'].append(int(is_barrel(row['Exit Velo'], row['Launch Angle'])))
+
+    def individual_hits(elite_data):
+        columns = {'player': [], 'exit_velo': [], 'distance': [], 'event': []}
+        for row in order_individual_hits(elite_data):
+            columns['player'].append(player(row['Batter']))
+            columns['exit_velo'].append(_number(row['Exit Velo']))
+            columns['distance'].append(_number(row['Distance (ft)']))
+            columns['event'].append(events(str(row['Event'])))
+        return columns
+
+    rolling = {'player': [], 'total_count': [], 'best_exit_velo': [], 'best_distance': [],
+               'best_event': [], 'days_active': []}
+    for row in rolling_leaderboard[:25]:
+        rolling['player'].append(player(row['Batter']))
+        rolling['total_count'].append(row['Total_Count'])
+        rolling['best_exit_velo'].append(_number(row['Best_Exit_Velo']))
+        rolling['best_distance'].append(_number(row['Best_Distance']))
+        rolling['best_event'].append(events(str(row['Best_Event'])))
+        rolling['days_active'].append(row['Days_Active'])
+
+    bundle = {
+        'version': BUNDLE_VERSION,
+        'meta': meta,
+        'hits': hits,
+        'team_stats': team_stats,
+        'today': individual_hits(elite_leaderboard),
+        'yesterday': individual_hits(elite_leaderboard_day_before),
+        'rolling': rolling,
+    }
+    # Dictionaries are filled while the tables above are built
+    bundle['teams'] = teams.values
+    bundle['events'] = events.values
+    bundle['players'] = {'name': [name for name, _ in players.values], 'team': player_teams}
+    return bundle
+
+
+def serialize_bundle(bundle):
+    """Return a bundle as compact JSON bytes"""
+    return json.dumps(bundle, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
@@ -0,0 +1,76 @@
+"""Precompressed .gz/.br siblings of build artifacts and Accept-Encoding negotiation.
+
+The build compresses each artifact once at maximum level, so the server
+never compresses at request time. Brotli is optional: without the brotli
+package only .gz siblings are written.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred order when a client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors():
+    compressors = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors['.br'] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def precompress(path):
+    """Write .gz (and .br if available) siblings of path unless they are already up to date"""
+    if not os.path.exists(path):
+        return
+    source_mtime = os.stat(path).st_mtime_ns
+    data = None
+    for suffix, compress in _compressors().items():
+        target = path + suffix
+        if os.path.exists(target) and os.stat(target).st_mtime_ns >= source_mtime:
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        tmp_target = f"{target}.{os.getpid()}.tmp"
+        with open(tmp_target, 'wb') as f:
+            f.write(compress(data))
+        os.replace(tmp_target, target)
+
+
+def accepted_encodings(accept_encoding):
+    """Parse an Accept-Encoding header into the set of encodings with a non-zero q-value"""
+    accepted = set()
+    rejected = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding)
+        else:
+            rejected.add(coding)
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS if encoding not in rejected)
+    return accepted
+
+
+def negotiate(accept_encoding, available):
+    """Pick the best (encoding, suffix) among available suffixes, or (None, '') for identity"""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and suffix in available:
+            return encoding, suffix
+    return None, ''
@@ -0,0 +1,22 @@
+"""Integer codes for batted-ball outcomes.
+
+Codes double as the priority used for "best event": a higher code is a better
+outcome, so the best event of any group of hits is a plain max over an int8
+column. Every non-hit outcome (outs, sac flies, errors...) shares code 0 and
+displays as 'field_out', matching how the history always reported it.
+"""
+import numpy as np
+
+EVENT_CODES = {'field_out': 0, 'single': 1, 'double': 2, 'triple': 3}
+EVENT_NAMES = {code: event for event, code in EVENT_CODES.items()}
+EVENT_CODE_DTYPE = np.int8
+
+
+def encode_events(events):
+    """Encode a Series of Statcast event names as int8 codes"""
+    return events.map(EVENT_CODES).fillna(0).astype(EVENT_CODE_DTYPE)
+
+
+def event_name(code):
+    """Decode an event code back to the name shown on the page"""
+    return EVENT_NAMES.get(int(code), 'field_out')
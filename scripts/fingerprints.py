@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import glob
+import pickle
+import re
+import time
+
+import pandas as pd
+
+from storage import atomic_write
+
+CACHE_DIR = "../data/cache"
+FINGERPRINT_FILE = os.path.join(CACHE_DIR, "fingerprints.json")
+# Stages run once per date are recorded as <stage>-YYYY-MM-DD
+DAY_STAGE_RE = re.compile(r'^[a-z_]+-(\d{4}-\d{2}-\d{2})$')
+
+
+def fingerprint(*parts):
+    """Return a stable sha256 hex digest of DataFrames, bytes, strings or JSON-able values"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(json.dumps([str(c) for c in part.columns]).encode('utf-8'))
+            if len(part) > 0:
+                digest.update(pd.util.hash_pandas_object(part, index=False).values.tobytes())
+        elif isinstance(part, (bytes, bytearray)):
+            digest.update(part)
+        elif isinstance(part, str):
+            digest.update(part.encode('utf-8'))
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def source_fingerprint():
+    """Fingerprint the pipeline source so code changes invalidate every cached stage"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = []
+    for path in sorted(glob.glob(os.path.join(script_dir, "*.py"))):
+        with open(path, 'rb') as f:
+            sources.append(f.read())
+    return fingerprint(*sources)
+
+
+def file_fingerprint(*paths):
+    """Fingerprint the contents of files, treating missing files as empty"""
+    contents = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+        else:
+            contents.append(b'')
+    return fingerprint(*contents)
+
+
+def load_fingerprints():
+    """Load the stage fingerprints recorded by the last run"""
+    if os.path.exists(FINGERPRINT_FILE):
+        try:
+            with open(FINGERPRINT_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_fingerprints(fingerprints):
+    """Save stage fingerprints, replacing the previous file atomically"""
+    atomic_write(FINGERPRINT_FILE, json.dumps(fingerprints, indent=2, sort_keys=True))
+
+
+def cached_frame(fingerprints, stage, inputs_fingerprint, build):
+    """Return the cached DataFrame for a stage when its inputs are unchanged, otherwise build and cache it"""
+    cache_file = os.path.join(CACHE_DIR, f"{stage}.pkl")
+    if fingerprints.get(stage) == inputs_fingerprint and os.path.exists(cache_file):
+        try:
+            frame = pd.read_pickle(cache_file)
+            print(f"{stage}: inputs unchanged, reusing cached result")
+            return frame
+        except Exception as e:
+            print(f"{stage}: could not read cache ({e}), rebuilding")
+
+    frame = build()
+    atomic_write(cache_file, pickle.dumps(frame), mode='wb')
+    fingerprints[stage] = inputs_fingerprint
+    return frame
+
+
+def prune_day_stages(fingerprints, keep_days):
+    """Forget the per-date stage fingerprints and cached frames of dates not in keep_days"""
+    for stage in list(fingerprints):
+        match = DAY_STAGE_RE.match(stage)
+        if match and match.group(1) not in keep_days:
+            del fingerprints[stage]
+            cache_file = os.path.join(CACHE_DIR, f"{stage}.pkl")
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+
+
+FRAGMENT_DIR = os.path.join(CACHE_DIR, "fragments")
+FRAGMENT_MAX_AGE = 7 * 24 * 3600
+fragment_stats = {'hits': 0, 'misses': 0}
+
+
+def cached_fragment(key, render):
+    """Yield a rendered fragment from the cache, or render it with render() and cache it under key"""
+    path = os.path.join(FRAGMENT_DIR, f"{key}.html")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        os.utime(path)
+        fragment_stats['hits'] += 1
+    except FileNotFoundError:
+        content = ''.join(render())
+        atomic_write(path, content)
+        fragment_stats['misses'] += 1
+    yield content
+
+
+def fragment_cached(key):
+    """Whether a fragment is already cached under key"""
+    return os.path.exists(os.path.join(FRAGMENT_DIR, f"{key}.html"))
+
+
+def prune_fragments(max_age=FRAGMENT_MAX_AGE):
+    """Delete cached fragments that haven't been used within max_age seconds"""
+    if not os.path.isdir(FRAGMENT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(FRAGMENT_DIR):
+        if entry.name.endswith('.html') and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
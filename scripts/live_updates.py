@@ -0,0 +1,127 @@
+"""Server-sent leaderboard diffs for assets/js/live.js.
+
+Each build writes leaderboards.json: the rolling and today leaderboard rows
+as rendered HTML, keyed by player (see sections.keyed_rows) and tagged with
+the page's build fingerprint. A page streams /api/v1/events?since=<its
+fingerprint>; whenever the served build's leaderboards differ from the ones
+the client has, it gets one event with the new row order and only the rows
+that are new or changed.
+
+Every open stream holds a server thread, so streams are capped per process
+(overflowing clients are told to retry later) and closed after a few
+minutes; EventSource reconnects and resumes from its Last-Event-ID.
+"""
+import json
+import os
+import threading
+import time
+
+from artifact_cache import get_artifact
+from artifacts import ARTIFACTS_DIR, SITE_DIR, current_site_dir
+
+LEADERBOARDS_FILE_NAME = "leaderboards.json"
+SECTIONS = ('rolling', 'today')
+POLL_SECONDS = 2
+KEEPALIVE_SECONDS = 15
+STREAM_SECONDS = 300
+RECONNECT_MS = 1000
+BUSY_RETRY_MS = 60000
+# Streams one process serves at once; the rest of its threads stay free for page requests
+MAX_STREAMS = int(os.environ.get('ALMOSTHOMERS_EVENT_STREAMS', '16'))
+
+_streams = threading.BoundedSemaphore(MAX_STREAMS) if MAX_STREAMS > 0 else None
+_lock = threading.Lock()
+_parsed = {}  # (path, etag) -> leaderboards, for the builds seen recently
+KEEP_PARSED = 8
+
+
+def limit_streams(max_streams):
+    """Serve at most max_streams streams at once in this process (0 turns streaming off)"""
+    global _streams
+    _streams = threading.BoundedSemaphore(max_streams) if max_streams > 0 else None
+
+
+def _load(site_dir):
+    """The leaderboards of one build, or None if it has none"""
+    path = os.path.join(site_dir, LEADERBOARDS_FILE_NAME)
+    try:
+        entry = get_artifact(site_dir, path) if site_dir == current_site_dir() else None
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    if entry is not None:
+        key = (path, entry.etag)
+        raw = entry.bodies['']
+    else:
+        # An older build: read it directly rather than evicting the served build from the cache
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except OSError:
+            return None
+        key = (path, len(raw), os.stat(path).st_mtime_ns)
+    with _lock:
+        if key not in _parsed:
+            if len(_parsed) >= KEEP_PARSED:
+                _parsed.pop(next(iter(_parsed)))
+            _parsed[key] = json.loads(raw)
+        return _parsed[key]
+
+
+def current_leaderboards():
+    return _load(current_site_dir())
+
+
+def find_leaderboards(version):
+    """The leaderboards a page with this build fingerprint shows, if a build that made them is still on disk"""
+    with _lock:
+        for boards in _parsed.values():
+            if boards['version'] == version:
+                return boards
+    candidates = [SITE_DIR]
+    if os.path.isdir(ARTIFACTS_DIR):
+        candidates += [os.path.join(ARTIFACTS_DIR, entry.name) for entry in os.scandir(ARTIFACTS_DIR)
+                       if entry.is_dir(follow_symlinks=False)]
+    for site_dir in candidates:
+        boards = _load(site_dir)
+        if boards is not None and boards['version'] == version:
+            return boards
+    return None
+
+
+def diff_leaderboards(old, new):
+    """What turns the old leaderboards into the new ones: per changed section, the row order and the rows to (re)place
+
+    With no old leaderboards every row is sent.
+    """
+    sections = {}
+    for section in SECTIONS:
+        old_rows = dict(old[section]) if old else {}
+        order = [key for key, _ in new[section]]
+        rows = {key: html for key, html in new[section] if old_rows.get(key) != html}
+        if rows or old is None or order != [key for key, _ in old[section]]:
+            sections[section] = {'order': order, 'rows': rows}
+    return {'version': new['version'], 'sections': sections}
+
+
+def iter_events(since):
+    """Yield the event stream of a client whose page shows the since version of the leaderboards"""
+    streams = _streams
+    if streams is None or not streams.acquire(blocking=False):
+        yield f"retry: {BUSY_RETRY_MS}\n\n"
+        return
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        started = last_sent = time.monotonic()
+        while time.monotonic() - started < STREAM_SECONDS:
+            boards = current_leaderboards()
+            if boards is not None and since != boards['version']:
+                diff = diff_leaderboards(find_leaderboards(since) if since else None, boards)
+                yield f"id: {boards['version']}\nevent: leaderboards\ndata: {json.dumps(diff)}\n\n"
+                since = boards['version']
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(POLL_SECONDS)
+    finally:
+        streams.release()
@@ -0,0 +1,239 @@
+"""Prometheus metrics for /metrics, rendered without a client library.
+
+Two kinds of samples are merged into one exposition:
+
+- Request-side metrics (latency per route, artifact cache lookups) are
+  recorded in memory by each serving process. With several gunicorn workers,
+  each worker flushes its totals to data/metrics/workers/<pid>.json and the
+  master folds the file of an exited worker into merged.json, so totals
+  survive worker restarts (the scheme prometheus_client's multiprocess mode
+  uses).
+- Build-side metrics (stage durations, rows and bytes fetched, fragment
+  cache lookups) are folded into data/metrics/builds.json by each build
+  under a file lock, so they cover every build whichever process ran it.
+
+Gauges about the served build (size, age) are read from its build.json
+when scraped.
+
+A snapshot is {'counters': {name: {labels: value}}, 'histograms': {name:
+{labels: {'buckets': [...], 'sum': s, 'count': n}}}} with labels already
+rendered as 'route="/",status="200"'.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+from storage import atomic_write, file_lock
+
+METRICS_DIR = "../data/metrics"
+WORKERS_DIR = os.path.join(METRICS_DIR, "workers")
+MERGED_FILE = os.path.join(METRICS_DIR, "merged.json")
+BUILDS_FILE = os.path.join(METRICS_DIR, "builds.json")
+FLUSH_INTERVAL = 5
+
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'almosthomers_http_request_duration_seconds': (
+        'histogram', "Time to answer a request, by route and status", LATENCY_BUCKETS),
+    'almosthomers_artifact_cache_lookups_total': (
+        'counter', "Served-file lookups in the in-memory artifact cache, by result", None),
+    'almosthomers_api_cache_lookups_total': (
+        'counter', "Query API lookups in the response cache, by result", None),
+    'almosthomers_builds_total': ('counter', "Completed builds", None),
+    'almosthomers_build_duration_seconds': ('histogram', "Wall time of a whole build", STAGE_BUCKETS),
+    'almosthomers_build_stage_seconds': (
+        'histogram', "Wall time of each build stage (player_lookup is part of process)", STAGE_BUCKETS),
+    'almosthomers_fetched_rows_total': ('counter', "Statcast rows pulled by builds", None),
+    'almosthomers_fetched_bytes_total': ('counter', "In-memory size of the Statcast data pulled by builds", None),
+    'almosthomers_fragment_cache_lookups_total': (
+        'counter', "Rendered-section lookups in the fragment cache during builds, by result", None),
+    'almosthomers_rebuild_triggers_total': (
+        'counter', "Rebuild triggers, by whether they started a build or attached to a pending one", None),
+    'almosthomers_rebuilds_total': (
+        'counter', "Coalesced rebuilds, by result (joined = another process attempted one first)", None),
+    'almosthomers_artifact_bytes': ('gauge', "Size of the served build on disk", None),
+    'almosthomers_build_age_seconds': ('gauge', "Seconds since the served build finished", None),
+    'almosthomers_build_stale': ('gauge', "1 when the served build is older than ALMOSTHOMERS_STALE_AGE", None),
+}
+
+
+def empty_snapshot():
+    return {'counters': {}, 'histograms': {}}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+def add_counter(snapshot, name, amount=1, **labels):
+    values = snapshot['counters'].setdefault(name, {})
+    key = render_labels(**labels)
+    values[key] = values.get(key, 0) + amount
+
+
+def add_observation(snapshot, name, value, **labels):
+    buckets = METRICS[name][2]
+    series = snapshot['histograms'].setdefault(name, {}).setdefault(
+        render_labels(**labels), {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0})
+    series['buckets'][bisect.bisect_left(buckets, value)] += 1
+    series['sum'] += value
+    series['count'] += 1
+
+
+def merge_snapshots(*snapshots):
+    merged = empty_snapshot()
+    for snapshot in snapshots:
+        for name, values in snapshot['counters'].items():
+            for labels, value in values.items():
+                merged['counters'].setdefault(name, {})
+                merged['counters'][name][labels] = merged['counters'][name].get(labels, 0) + value
+        for name, values in snapshot['histograms'].items():
+            for labels, series in values.items():
+                target = merged['histograms'].setdefault(name, {}).setdefault(
+                    labels, {'buckets': [0] * len(series['buckets']), 'sum': 0.0, 'count': 0})
+                target['buckets'] = [a + b for a, b in zip(target['buckets'], series['buckets'])]
+                target['sum'] += series['sum']
+                target['count'] += series['count']
+    return merged
+
+
+def _load_snapshot(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return empty_snapshot()
+
+
+# This process's request-side metrics
+_lock = threading.Lock()
+_local = empty_snapshot()
+_shared = False
+
+
+def inc(name, amount=1, **labels):
+    with _lock:
+        add_counter(_local, name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    with _lock:
+        add_observation(_local, name, value, **labels)
+
+
+def _worker_file(pid=None):
+    return os.path.join(WORKERS_DIR, f"{pid or os.getpid()}.json")
+
+
+def flush():
+    """Write this worker's totals where the other workers' /metrics can read them"""
+    with _lock:
+        raw = json.dumps(_local)
+    atomic_write(_worker_file(), raw)
+
+
+def start_sharing():
+    """Share this worker's metrics with the other workers (called in each gunicorn worker)
+
+    Starts from zero: anything recorded in the master before the fork is
+    not this worker's.
+    """
+    global _local, _shared
+    with _lock:
+        _local = empty_snapshot()
+    _shared = True
+
+    def flush_loop():
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            flush()
+
+    threading.Thread(target=flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def reset_shared():
+    """Forget the worker totals of a previous server run (called in the gunicorn master)"""
+    os.makedirs(WORKERS_DIR, exist_ok=True)
+    for name in os.listdir(WORKERS_DIR):
+        os.remove(os.path.join(WORKERS_DIR, name))
+    if os.path.exists(MERGED_FILE):
+        os.remove(MERGED_FILE)
+
+
+def fold_worker(pid):
+    """Fold an exited worker's totals into merged.json (called in the gunicorn master)"""
+    worker_file = _worker_file(pid)
+    if not os.path.exists(worker_file):
+        return
+    atomic_write(MERGED_FILE, json.dumps(merge_snapshots(_load_snapshot(MERGED_FILE), _load_snapshot(worker_file))))
+    os.remove(worker_file)
+
+
+def record_build(report):
+    """Fold one build's report (see build_report.py) into the build metrics"""
+    with file_lock(BUILDS_FILE + ".lock"):
+        snapshot = _load_snapshot(BUILDS_FILE)
+        add_counter(snapshot, 'almosthomers_builds_total')
+        add_observation(snapshot, 'almosthomers_build_duration_seconds', report['duration_seconds'])
+        for stage, seconds in report['stages'].items():
+            add_observation(snapshot, 'almosthomers_build_stage_seconds', seconds, stage=stage)
+        add_counter(snapshot, 'almosthomers_fetched_rows_total', report['rows_fetched'])
+        add_counter(snapshot, 'almosthomers_fetched_bytes_total', report['bytes_fetched'])
+        add_counter(snapshot, 'almosthomers_fragment_cache_lookups_total', report['fragment_cache']['hits'], result='hit')
+        add_counter(snapshot, 'almosthomers_fragment_cache_lookups_total', report['fragment_cache']['misses'],
+                    result='miss')
+        atomic_write(BUILDS_FILE, json.dumps(snapshot))
+
+
+def collect():
+    """Every process's request metrics plus the build metrics"""
+    with _lock:
+        local = json.loads(json.dumps(_local))
+    snapshots = [local, _load_snapshot(BUILDS_FILE)]
+    if _shared:
+        own_file = _worker_file()
+        snapshots.append(_load_snapshot(MERGED_FILE))
+        if os.path.isdir(WORKERS_DIR):
+            snapshots.extend(_load_snapshot(os.path.join(WORKERS_DIR, name))
+                             for name in os.listdir(WORKERS_DIR)
+                             if os.path.join(WORKERS_DIR, name) != own_file and name.endswith('.json'))
+    return merge_snapshots(*snapshots)
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def iter_exposition(snapshot, gauges):
+    """Yield the Prometheus text format of a snapshot plus {name: value} gauges"""
+    for name, (kind, help_text, buckets) in METRICS.items():
+        if kind == 'gauge':
+            if name not in gauges:
+                continue
+            series = {'': gauges[name]}
+        else:
+            series = snapshot['counters' if kind == 'counter' else 'histograms'].get(name)
+            if not series:
+                continue
+        yield f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n"
+        for labels, value in sorted(series.items()):
+            if kind != 'histogram':
+                yield f"{name}{{{labels}}} {_format(value)}\n" if labels else f"{name} {_format(value)}\n"
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], value['buckets']):
+                cumulative += count
+                bucket_labels = ','.join(part for part in (labels, f'le="{bound}"') if part)
+                yield f"{name}_bucket{{{bucket_labels}}} {cumulative}\n"
+            suffix = f"{{{labels}}}" if labels else ''
+            yield f"{name}_sum{suffix} {_format(value['sum'])}\n"
+            yield f"{name}_count{suffix} {value['count']}\n"
@@ -0,0 +1,224 @@
+"""Stream elite_contact_history.json into the season matrices.
+
+The history file is a two-level object ({date: {batter html: entry}}) that can
+grow large, so it is parsed incrementally: only the current read buffer and one
+day's worth of rows are held in memory at a time.
+
+Usage (from the scripts directory):
+    python migrate_history.py [--history PATH] [--overwrite] [--no-lookup] [--dry-run]
+"""
+import argparse
+import json
+import os
+from json.decoder import scanstring
+
+import pandas as pd
+
+from events import EVENT_CODES
+from sections import parse_batter_key
+from season_matrix import SEASON_DIR, day_has_data, load_player_registry, write_day_rows
+
+DEFAULT_HISTORY_FILE = "../almosthomers/elite_contact_history.json"
+CHUNK_SIZE = 64 * 1024
+
+
+class HistoryReader:
+    """Buffered reader over a JSON document that refills on demand and drops consumed text"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk, discarding everything before pos. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def separator(self):
+        """Consume the ',' or '}' after an object member and return True at the closing brace"""
+        found = self.peek()
+        if found not in (',', '}'):
+            raise ValueError(f"Expected ',' or '}}' but found {found!r}")
+        self.pos += 1
+        return found == '}'
+
+    def decode(self, parse):
+        """Run parse(buf, pos) -> (value, end), reading more input while the value is truncated"""
+        while True:
+            try:
+                value, end = parse(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def string(self):
+        self.expect('"')
+        return self.decode(scanstring)
+
+    def value(self):
+        self.peek()
+        return self.decode(json.JSONDecoder().raw_decode)
+
+    def keys(self):
+        """Iterate the keys of the object at the current position, leaving each value unread"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.string()
+            self.expect(':')
+            yield key
+            if self.separator():
+                return
+
+
+def iter_history_entries(path, chunk_size=CHUNK_SIZE):
+    """Yield (date, batter key, entry dict) from a history file without loading it whole"""
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = HistoryReader(f, chunk_size)
+        for date_str in reader.keys():
+            for batter_key in reader.keys():
+                yield date_str, batter_key, reader.value()
+
+
+def build_name_index():
+    """Map player names to MLBAM ids from every season registry already on disk"""
+    name_index = {}
+    if os.path.isdir(SEASON_DIR):
+        for season in sorted(os.listdir(SEASON_DIR)):
+            registry = load_player_registry(season)
+            name_index.update(zip(registry['names'], registry['mlbam_ids']))
+    return name_index
+
+
+def lookup_player_id(name):
+    """Resolve a 'First Last' name to an MLBAM id through the Chadwick register"""
+    from pybaseball import playerid_lookup
+
+    first, _, last = name.partition(' ')
+    if not last:
+        return None
+    matches = playerid_lookup(last, first)
+    if 'mlb_played_last' in matches.columns:
+        matches = matches.sort_values('mlb_played_last', ascending=False)
+    matches = matches[matches['key_mlbam'].notna() & (matches['key_mlbam'] > 0)]
+    return int(matches['key_mlbam'].iloc[0]) if len(matches) > 0 else None
+
+
+def entry_row(mlbam_id, name, team, entry):
+    """Convert a history entry into a season matrix row
+
+    The history only keeps elite hits without launch angles, so the counts of
+    all batted balls and of barrels can't be recovered and are stored as 0.
+    """
+    return {
+        'mlbam_id': mlbam_id,
+        'name': name,
+        'team': team,
+        'elite_count': entry.get('count', 0),
+        'max_exit_velo': entry.get('best_exit_velo', 0),
+        'max_distance': entry.get('best_distance', 0),
+        'best_event': EVENT_CODES.get(entry.get('best_event'), 0),
+        'batted_balls': 0,
+        'barrels': 0,
+    }
+
+
+def migrate(history_file, overwrite=False, lookup=True, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Stream the history into the season matrices one day at a time and return a summary dict"""
+    name_index = build_name_index()
+    summary = {'days': 0, 'days_skipped': 0, 'rows': 0, 'unresolved': 0}
+
+    def flush(date_str, rows):
+        if date_str is None:
+            return
+        if not rows:
+            # Writing an empty day would zero its column, erasing whatever the pipeline recorded
+            print(f"{date_str}: no players resolved, skipping")
+            summary['days_skipped'] += 1
+            return
+        if not overwrite and day_has_data(date_str):
+            print(f"{date_str}: already in season matrices, skipping (use --overwrite to replace)")
+            summary['days_skipped'] += 1
+            return
+        if not dry_run:
+            write_day_rows(date_str, pd.DataFrame(rows, columns=list(entry_row(0, '', '', {}).keys())))
+        print(f"{date_str}: {len(rows)} players")
+        summary['days'] += 1
+        summary['rows'] += len(rows)
+
+    current_date, rows = None, []
+    for date_str, batter_key, entry in iter_history_entries(history_file, chunk_size):
+        if date_str != current_date:
+            flush(current_date, rows)
+            current_date, rows = date_str, []
+
+        name, team = parse_batter_key(batter_key)
+        mlbam_id = entry.get('player_id') or name_index.get(name)
+        # A cached None is a name already looked up without success
+        if mlbam_id is None and lookup and name not in name_index:
+            try:
+                mlbam_id = lookup_player_id(name)
+            except Exception as e:
+                print(f"Lookup failed for {name}: {e}")
+            name_index[name] = mlbam_id
+        if mlbam_id is None:
+            summary['unresolved'] += 1
+            continue
+
+        rows.append(entry_row(int(mlbam_id), name, team, entry))
+
+    flush(current_date, rows)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate elite contact history JSON into the season matrices")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_FILE, help="history JSON file to migrate")
+    parser.add_argument('--overwrite', action='store_true', help="replace days already present in the matrices")
+    parser.add_argument('--no-lookup', action='store_true', help="don't query the player register for unknown names")
+    parser.add_argument('--dry-run', action='store_true', help="parse and resolve without writing")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="bytes read per chunk")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.history):
+        parser.error(f"{args.history} not found")
+
+    summary = migrate(args.history, overwrite=args.overwrite, lookup=not args.no_lookup,
+                      dry_run=args.dry_run, chunk_size=args.chunk_size)
+    print(f"Migrated {summary['rows']} rows over {summary['days']} days "
+          f"({summary['days_skipped']} days skipped, {summary['unresolved']} players unresolved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Fan CPU-bound section rendering out over a process pool.
+
+Sections are rendered from compact payloads (formatted stats plus column
+arrays, see sections.team_section_payload) rather than DataFrames, and
+results are yielded in submission order as they finish, so the assembled
+page is identical to a serial render and only finished sections are held.
+Workers come from a forkserver rather than a fork of the build process,
+which may be a threaded gunicorn worker whose locks a fork could copy
+mid-use. Shipping rows costs a good part of rendering them, so only large
+renders use the pool.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def available_cpus():
+    """CPUs this process may use: the cgroup quota inside a container, else its CPU affinity"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+RENDER_WORKERS = int(os.environ.get('ALMOSTHOMERS_RENDER_WORKERS', '0')) or available_cpus()
+# Rendering takes ~7us a row and collecting a rendered row from a worker ~2.5us, and a pool starts in ~30ms
+# once the forkserver is up (~0.5s for the first pool, which imports pandas). With 4 workers that breaks
+# even around 11,000 rows; a day's hits are a few hundred, so only season-sized renders use the pool.
+MIN_PARALLEL_ROWS = int(os.environ.get('ALMOSTHOMERS_PARALLEL_MIN_ROWS', '20000'))
+
+
+def _pool_context():
+    """forkserver with the renderer preloaded, so later pools start without re-importing pandas; else spawn"""
+    try:
+        context = multiprocessing.get_context('forkserver')
+    except ValueError:  # Windows
+        return multiprocessing.get_context('spawn')
+    context.set_forkserver_preload(['sections'])
+    return context
+
+
+def iter_render_sections(render, payloads, rows, workers=RENDER_WORKERS):
+    """Yield render(payload) for each payload in order, rendered in parallel when worthwhile
+
+    rows is the number of table rows across the payloads, which is what the
+    render time scales with. render must be a module-level function so it
+    can be sent to the workers.
+    """
+    if workers <= 1 or rows < MIN_PARALLEL_ROWS:
+        for payload in payloads:
+            yield render(payload)
+        return
+
+    payloads = list(payloads)
+    workers = min(workers, len(payloads))
+    chunksize = max(1, len(payloads) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        yield from pool.map(render, payloads, chunksize=chunksize)
@@ -0,0 +1,718 @@
+from pybaseball import statcast, playerid_reverse_lookup
+from datetime import datetime, timedelta
+import pandas as pd
+import os
+import json
+import re
+import filecmp
+from contextlib import contextmanager, nullcontext
+from storage import file_lock, atomic_write, atomic_write_stream
+from templates import load_component, iter_render
+from sections import (
+    is_barrel, generate_elite_players_section, iter_rolling_leaderboard_rows,
+    iter_individual_hitters_rows, iter_team_partitions, team_section_payload, render_team_section,
+    team_page_count, team_page_url, iter_team_options, parse_batter_key, iter_live_leaderboards
+)
+from compression import precompress
+from asset_manifest import publish_assets
+from parallel_render import iter_render_sections
+from archive import (
+    ARCHIVE_INDEX_NAME, archive_day_dir, format_archive_date, load_archive_manifest, save_archive_manifest,
+    iter_archive_index
+)
+from bundle import build_data_bundle, serialize_bundle
+from api_index import HITS_FILE_NAME, ROLLING_FILE_NAME, SEASON_FILE_NAME
+from live_updates import LEADERBOARDS_FILE_NAME
+from build_report import StageTimer, utc_now, write_build_report
+from metrics import record_build
+from events import EVENT_CODES, encode_events, event_name
+from season_matrix import record_day, recorded_days, season_leaderboard
+from fingerprints import (
+    fingerprint, source_fingerprint, file_fingerprint, load_fingerprints, save_fingerprints, cached_frame,
+    cached_fragment, fragment_cached, prune_fragments, fragment_stats, prune_day_stages
+)
+
+# Build options
+SITE_DIR = "../almosthomers"
+# ALMOSTHOMERS_OUTPUT_MODE: 'inline' puts every team table in index.html,
+# 'fragments' writes each team section to <site>/teams/ for on-demand loading,
+# 'bundle' writes the data as <site>/data.json and renders tables in the browser
+OUTPUT_MODE = os.environ.get('ALMOSTHOMERS_OUTPUT_MODE', 'inline')
+
+# Rows each team section renders inline; the rest are written to <site>/pages/
+# and fetched a page at a time. ALMOSTHOMERS_TEAM_ROW_BUDGET sets the default
+# (0 = no limit), ALMOSTHOMERS_TEAM_ROW_BUDGETS="NYY=50,LAD=0" overrides single teams.
+TEAM_ROW_BUDGET = int(os.environ.get('ALMOSTHOMERS_TEAM_ROW_BUDGET', '25'))
+TEAM_ROW_BUDGETS = {
+    team.strip().upper(): int(budget)
+    for team, _, budget in (
+        item.partition('=') for item in os.environ.get('ALMOSTHOMERS_TEAM_ROW_BUDGETS', '').split(',') if '=' in item
+    )
+}
+
+def team_row_budget(team):
+    """Inline row budget of one team's section"""
+    return TEAM_ROW_BUDGETS.get(team, TEAM_ROW_BUDGET)
+
+# Copy all the functions from the original script (keeping the same logic)
+# The history is pipeline state shared by every build, so it stays in almosthomers/
+# even when a build writes its pages somewhere else
+HISTORY_FILE = "../almosthomers/elite_contact_history.json"
+HISTORY_LOCK_FILE = HISTORY_FILE + ".lock"
+
+def load_historical_data():
+    """Load historical elite contact data from JSON file"""
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+def save_historical_data(data):
+    """Save historical elite contact data to JSON file"""
+    atomic_write(HISTORY_FILE, json.dumps(data, indent=2))
+
+@contextmanager
+def history_transaction():
+    """Load the history under the writer lock, yield it for mutation and save it if it changed
+
+    Builders in other processes or pods sharing the file queue on the lock;
+    readers never take it since saves replace the file atomically.
+    """
+    with file_lock(HISTORY_LOCK_FILE):
+        data = load_historical_data()
+        before = json.dumps(data, sort_keys=True)
+        yield data
+        if json.dumps(data, sort_keys=True) != before:
+            save_historical_data(data)
+
+def update_rolling_data(historical_data, today_data, current_date):
+    """Update rolling 4-day data with today's elite contact hits"""
+    date_str = current_date
+    historical_data[date_str] = {}
+    
+    # One vectorized pass for the per-player aggregates; best event is a max over event codes
+    aggregates = today_data.groupby('Batter', sort=False).agg(
+        player_id=('Batter ID', 'first'),
+        count=('Exit Velo', 'size'),
+        best_exit_velo=('Exit Velo', 'max'),
+        best_distance=('Distance (ft)', 'max'),
+        best_event=('Event Code', 'max')
+    )
+    
+    hits = {}
+    for player_name, exit_velo, distance, event in zip(
+            today_data['Batter'], today_data['Exit Velo'], today_data['Distance (ft)'], today_data['Event']):
+        hits.setdefault(player_name, []).append({
+            'exit_velo': exit_velo,
+            'distance': distance,
+            'event': event
+        })
+    
+    for player_name, stats in zip(aggregates.index, aggregates.itertuples(index=False)):
+        historical_data[date_str][player_name] = {
+            'player_id': int(stats.player_id),
+            'count': int(stats.count),
+            'best_exit_velo': float(stats.best_exit_velo),
+            'best_distance': float(stats.best_distance),
+            'best_event': event_name(stats.best_event),
+            'hits': hits[player_name]
+        }
+    
+    all_dates = sorted(historical_data.keys())
+    if len(all_dates) > 4:
+        for old_date in all_dates[:-4]:
+            del historical_data[old_date]
+    
+    return historical_data
+
+def create_rolling_leaderboard(historical_data):
+    """Create 4-day rolling leaderboard from historical data"""
+    player_totals = {}
+    
+    for date_str, daily_data in historical_data.items():
+        for player_name, player_data in daily_data.items():
+            if player_name not in player_totals:
+                player_totals[player_name] = {
+                    'total_count': 0,
+                    'best_exit_velo': 0,
+                    'best_distance': 0,
+                    'best_event': 0,
+                    'days_active': 0,
+                    'batter_info': player_name
+                }
+            
+            player_totals[player_name]['total_count'] += player_data['count']
+            player_totals[player_name]['best_exit_velo'] = max(
+                player_totals[player_name]['best_exit_velo'], 
+                player_data['best_exit_velo']
+            )
+            player_totals[player_name]['best_distance'] = max(
+                player_totals[player_name]['best_distance'], 
+                player_data['best_distance']
+            )
+            player_totals[player_name]['days_active'] += 1
+            player_totals[player_name]['best_event'] = max(
+                player_totals[player_name]['best_event'],
+                EVENT_CODES.get(player_data['best_event'], 0)
+            )
+    
+    leaderboard = []
+    for player_name, stats in player_totals.items():
+        leaderboard.append({
+            'Batter': stats['batter_info'],
+            'Total_Count': stats['total_count'],
+            'Best_Exit_Velo': stats['best_exit_velo'],
+            'Best_Distance': stats['best_distance'],
+            'Best_Event': event_name(stats['best_event']),
+            'Days_Active': stats['days_active']
+        })
+    
+    leaderboard.sort(key=lambda x: (x['Total_Count'], x['Best_Exit_Velo']), reverse=True)
+    return leaderboard
+
+# Process data (keeping original logic but simplified)
+def process_statcast_data(data, timer=None):
+    """Process statcast data and return formatted dataframe (timing the name lookup on timer)"""
+    if len(data) == 0:
+        return pd.DataFrame()
+    
+    # Filter data
+    filtered = data[
+        (data['launch_speed'].notna()) &
+        (data['launch_angle'].notna()) &
+        (data['hit_distance_sc'].notna()) &
+        (data['events'].notna()) &
+        (data['events'] != 'home_run') &
+        (data['launch_speed'] >= 93)
+    ]
+    
+    if len(filtered) == 0:
+        return pd.DataFrame()
+    
+    # Select columns
+    columns_to_select = [
+        'batter', 'launch_speed', 'launch_angle', 'hit_distance_sc', 'game_pk',
+        'events', 'inning_topbot', 'home_team', 'away_team'
+    ]
+    
+    if 'bat_speed' in filtered.columns:
+        columns_to_select.insert(4, 'bat_speed')
+    
+    subset = filtered[columns_to_select].copy()
+    
+    if 'bat_speed' not in subset.columns:
+        subset['bat_speed'] = float('nan')
+    
+    # Lookup batter names
+    batter_ids = subset['batter'].unique()
+    with timer.measure('player_lookup') if timer else nullcontext():
+        batter_names = playerid_reverse_lookup(batter_ids, key_type='mlbam')[['key_mlbam', 'name_first', 'name_last']]
+    batter_names['name_first'] = batter_names['name_first'].str.title()
+    batter_names['name_last'] = batter_names['name_last'].str.title()
+    batter_names['batter_name'] = batter_names['name_first'] + ' ' + batter_names['name_last']
+    
+    # Merge names
+    merged = subset.merge(
+        batter_names[['key_mlbam', 'batter_name']],
+        left_on='batter',
+        right_on='key_mlbam',
+        how='left'
+    )
+    
+    # Infer batting team from inning
+    merged['team_abbr'] = merged.apply(
+        lambda row: row['away_team'] if row['inning_topbot'] == 'Top' else row['home_team'],
+        axis=1
+    )
+    
+    # Map logos
+    def get_logo_url(team_abbr):
+        return f"https://a.espncdn.com/i/teamlogos/mlb/500/{team_abbr.lower()}.png"
+    
+    merged['team_logo'] = merged['team_abbr'].apply(get_logo_url)
+    
+    # Build batter+logo display
+    merged['batter_with_logo'] = merged.apply(
+        lambda row: f'<img src="{row["team_logo"]}" width="24" style="vertical-align:middle"> {row["batter_name"]}',
+        axis=1
+    )
+    
+    # Final selection
+    final = merged[[
+        'batter_with_logo', 'launch_speed', 'launch_angle', 'hit_distance_sc', 'bat_speed', 'game_pk', 'events', 'team_abbr', 'batter'
+    ]].sort_values(by='hit_distance_sc', ascending=False).reset_index(drop=True)
+    
+    # Rename columns
+    final.columns = ['Batter', 'Exit Velo', 'Launch Angle', 'Distance (ft)', 'Bat Speed', 'Game PK', 'Event', 'Team', 'Batter ID']
+    final['Event Code'] = encode_events(final['Event'])
+    
+    return final
+
+# Create elite leaderboards
+def select_elite_contact(day_frame):
+    """A day's elite contact: exit velo over 95 mph and distance over 200 ft"""
+    if len(day_frame) == 0:
+        return pd.DataFrame()
+    return day_frame[(day_frame['Exit Velo'] > 95) & (day_frame['Distance (ft)'] > 200)].copy()
+
+def rank_elite_contact(elite_criteria):
+    """Order elite contact for the individual hitters sections"""
+    if len(elite_criteria) == 0:
+        return pd.DataFrame()
+    # Count occurrences per player to determine sort order
+    player_counts = elite_criteria.groupby('Batter').size().reset_index(name='Count')
+    # Add count to each row for sorting
+    elite_criteria = elite_criteria.merge(player_counts, on='Batter', how='left')
+    # Sort by count (descending), then by exit velocity (descending)
+    return elite_criteria.sort_values(['Count', 'Exit Velo'], ascending=[False, False]).reset_index(drop=True)
+
+def day_hit_records(day_frame):
+    """A day's hits as plain rows for the query API (see api_index.py)"""
+    records = []
+    for batter, player_id, team, exit_velo, launch_angle, distance, bat_speed, event, game_pk in zip(
+            day_frame['Batter'], day_frame['Batter ID'], day_frame['Team'], day_frame['Exit Velo'],
+            day_frame['Launch Angle'], day_frame['Distance (ft)'], day_frame['Bat Speed'], day_frame['Event'],
+            day_frame['Game PK']):
+        records.append({
+            'player_id': int(player_id),
+            'player': parse_batter_key(str(batter))[0],
+            'team': team,
+            'exit_velo': float(exit_velo),
+            'launch_angle': float(launch_angle),
+            'distance': float(distance),
+            'bat_speed': None if pd.isna(bat_speed) else float(bat_speed),
+            'event': event,
+            'game_pk': int(game_pk)
+        })
+    return records
+
+def rolling_leaderboards(historical_data):
+    """Rolling leaderboards over the last 1..n recorded days, as plain rows for the query API"""
+    days = sorted(historical_data)
+    player_ids = {name: stats.get('player_id') for day in days for name, stats in historical_data[day].items()}
+    windows = {}
+    for window in range(1, len(days) + 1):
+        leaderboard = create_rolling_leaderboard({day: historical_data[day] for day in days[-window:]})
+        windows[window] = []
+        for row in leaderboard:
+            name, team = parse_batter_key(row['Batter'])
+            windows[window].append({
+                'player_id': player_ids[row['Batter']],
+                'player': name,
+                'team': team,
+                'total_count': row['Total_Count'],
+                'best_exit_velo': row['Best_Exit_Velo'],
+                'best_distance': row['Best_Distance'],
+                'best_event': row['Best_Event'],
+                'days_active': row['Days_Active']
+            })
+    return {'days': days, 'windows': windows}
+
+def copy_if_changed(src, dst):
+    """Copy src to dst unless dst already has identical contents"""
+    if not os.path.exists(src):
+        return
+    if os.path.exists(dst) and filecmp.cmp(src, dst, shallow=False):
+        return
+    # Replace rather than overwrite: dst may be hard-linked into a live artifact
+    with open(src, 'rb') as f:
+        atomic_write(dst, f.read(), mode='wb')
+
+def read_page_fingerprint(html_path):
+    """Read the build fingerprint embedded in a previously generated page"""
+    if not os.path.exists(html_path):
+        return None
+    with open(html_path, 'r', encoding='utf-8') as f:
+        head = f.read(4096)
+    match = re.search(r'<meta name="build-fingerprint" content="([0-9a-f]+)">', head)
+    return match.group(1) if match else None
+
+def write_if_changed(path, content):
+    """Atomically write content to path unless the file already holds it"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    atomic_write(path, content)
+
+def remove_stale_files(directory, keep):
+    """Delete files under directory (and their precompressed siblings) that aren't in keep"""
+    for root, _, names in os.walk(directory, topdown=False):
+        for name in names:
+            path = os.path.join(root, name)
+            if path not in keep and os.path.splitext(path)[0] not in keep:
+                os.remove(path)
+        if root != directory and not os.listdir(root):
+            os.rmdir(root)
+
+def build(output_dir=SITE_DIR):
+    """Pull the last two days of Statcast data and write the site to output_dir"""
+    # Create directories
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    fragment_stats.update(hits=0, misses=0)
+    timer = StageTimer()
+    os.makedirs("../assets/css", exist_ok=True)
+    os.makedirs("../assets/js", exist_ok=True)
+    os.makedirs("../components", exist_ok=True)
+
+    # Get data (simplified version of original logic)
+    today = (datetime.today() - timedelta(days=1)).strftime('%Y-%m-%d')
+    yesterday = (datetime.today() - timedelta(days=2)).strftime('%Y-%m-%d')
+
+    print(f"Pulling Statcast data for: {today}")
+    data = statcast(start_dt=today, end_dt=today)
+
+    print(f"Pulling Statcast data for day before: {yesterday}")
+    data_day_before = statcast(start_dt=yesterday, end_dt=yesterday)
+    fetched_at = utc_now()
+    timer.lap('fetch')
+
+    # Process both days, reusing the cached result when a day's raw pull is unchanged
+    fingerprints = load_fingerprints()
+    code_fingerprint = source_fingerprint()
+    final = cached_frame(fingerprints, f"processed-{today}", fingerprint(code_fingerprint, data),
+                         lambda: process_statcast_data(data, timer))
+    final_day_before = cached_frame(fingerprints, f"processed-{yesterday}", fingerprint(code_fingerprint, data_day_before),
+                                    lambda: process_statcast_data(data_day_before, timer))
+
+    print(f"Processed {len(final)} hits for today, {len(final_day_before)} hits for yesterday")
+
+    elite_criteria = select_elite_contact(final)
+    elite_leaderboard = rank_elite_contact(elite_criteria)
+    elite_leaderboard_day_before = rank_elite_contact(select_elite_contact(final_day_before))
+    timer.lap('process')
+
+    # Multi-day tracking (skipped when today's elite contact and the saved history are unchanged)
+    history_inputs_fingerprint = fingerprint(code_fingerprint, today, elite_criteria)
+    with history_transaction() as historical_data:
+        if (fingerprints.get('history_inputs') == history_inputs_fingerprint and
+                fingerprints.get('history_state') == fingerprint(historical_data)):
+            print("History: elite contact unchanged, skipping update")
+        else:
+            if len(elite_criteria) > 0:
+                update_rolling_data(historical_data, elite_criteria, today)
+            fingerprints['history_inputs'] = history_inputs_fingerprint
+            fingerprints['history_state'] = fingerprint(historical_data)
+
+    # Create rolling leaderboard
+    rolling_leaderboard = create_rolling_leaderboard(historical_data)
+
+    # Get date range for display
+    date_keys = sorted(historical_data.keys())
+    if date_keys:
+        start_date = datetime.strptime(date_keys[0], '%Y-%m-%d').strftime('%B %d')
+        end_date = datetime.strptime(date_keys[-1], '%Y-%m-%d').strftime('%B %d, %Y')
+        date_range = f"{start_date} - {end_date}" if len(date_keys) > 1 else end_date
+    else:
+        date_range = "No data available"
+
+    timer.lap('history')
+
+    # Generate timestamp
+    timestamp = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+
+    # Season matrices: per-player daily metrics behind the season leaderboard (season.json)
+    for day_str, day_frame in ((today, final), (yesterday, final_day_before)):
+        season_fingerprint = fingerprint(code_fingerprint, day_frame)
+        if fingerprints.get(f"season-{day_str}") == season_fingerprint:
+            continue
+        if len(day_frame) > 0:
+            barrel_flags = day_frame.apply(lambda row: is_barrel(row['Exit Velo'], row['Launch Angle']), axis=1)
+            players = record_day(day_str, day_frame, barrel_flags)
+            print(f"Season matrix: recorded {players} players for {day_str}")
+        fingerprints[f"season-{day_str}"] = season_fingerprint
+    timer.lap('season_matrix')
+
+    # Copy CSS and JS from assets to output directory
+    copy_if_changed('../assets/css/styles.css', os.path.join(output_dir, 'styles.css'))
+    copy_if_changed('../assets/js/favorites.js', os.path.join(output_dir, 'favorites.js'))
+    copy_if_changed('../assets/js/render.js', os.path.join(output_dir, 'render.js'))
+    copy_if_changed('../assets/js/live.js', os.path.join(output_dir, 'live.js'))
+
+    # Content-hashed copies referenced by the page, cacheable forever
+    asset_urls = publish_assets(site_dir=output_dir)
+
+    # The page only depends on the pipeline code, the templates and the section data
+    component_files = sorted(
+        os.path.join('../components', name) for name in os.listdir('../components') if name.endswith('.html')
+    )
+    page_fingerprint = fingerprint(
+        code_fingerprint,
+        OUTPUT_MODE,
+        TEAM_ROW_BUDGET,
+        TEAM_ROW_BUDGETS,
+        asset_urls,
+        file_fingerprint(*component_files),
+        final,
+        elite_leaderboard,
+        elite_leaderboard_day_before,
+        rolling_leaderboard,
+        date_range,
+        yesterday
+    )
+
+    def section_key(template_name, data):
+        """Fragment cache key of a section: its template, the pipeline code and its input data"""
+        return fingerprint(code_fingerprint, load_component(template_name), *data)
+
+    def iter_section(template_name, data, render):
+        """Yield a section from the fragment cache, rendering it only on a miss"""
+        yield from cached_fragment(section_key(template_name, data), render)
+
+    def iter_team_section_html(frame, section_dir):
+        """Yield (team, row count, section html) in team order, writing each team's overflow pages under section_dir
+
+        Sections missing from the fragment cache are rendered across the process
+        pool when there are enough rows, and each is written out as soon as it
+        is back. A section and its pages are cached as separate fragments so
+        they can be written without re-rendering.
+        """
+        partitions = list(iter_team_partitions(frame))
+        budgets = [team_row_budget(team) for team, _ in partitions]
+        keys = []
+        for (team, team_data), budget in zip(partitions, budgets):
+            # The section also renders team_more_rows.html for its "Show more" button
+            key = section_key('team_section.html', (team, team_data, budget, load_component('team_more_rows.html')))
+            page_count = team_page_count(len(team_data), budget)
+            keys.append([key] + [fingerprint(key, page) for page in range(1, page_count + 1)])
+        missing = [i for i, team_keys in enumerate(keys) if not all(fragment_cached(key) for key in team_keys)]
+        rendered_sections = iter_render_sections(
+            render_team_section, (team_section_payload(*partitions[i], budgets[i]) for i in missing),
+            rows=sum(len(partitions[i][1]) for i in missing)
+        )
+        missing = set(missing)
+
+        page_files = set()
+        for i, (team, team_data) in enumerate(partitions):
+            # Missing sections come back in team order, so this one is next
+            rendered = next(rendered_sections) if i in missing else None
+
+            def render_page(page):
+                nonlocal rendered
+                if rendered is None:  # cached when checked above, unless it was pruned since
+                    rendered = render_team_section(team_section_payload(team, team_data, budgets[i]))
+                return [rendered[page]]
+
+            section, *pages = [''.join(cached_fragment(key, lambda: render_page(page)))
+                               for page, key in enumerate(keys[i])]
+            for page, html in enumerate(pages, start=1):
+                page_file = os.path.join(section_dir, team_page_url(team, page))
+                write_if_changed(page_file, html)
+                precompress(page_file)
+                page_files.add(page_file)
+            yield team, len(team_data), section
+
+        remove_stale_files(os.path.join(section_dir, "pages"), page_files)
+
+    def iter_cached_team_tables():
+        """Yield the team tables, re-rendering only teams whose rows changed"""
+        for _, _, html in iter_team_section_html(final, output_dir):
+            yield html
+
+    def iter_lazy_team_tables():
+        """Write each team section to its own fragment file and yield placeholders that load them on demand"""
+        placeholder_template = load_component('team_placeholder.html')
+        fragment_files = set()
+        for team, count, fragment in iter_team_section_html(final, output_dir):
+            fragment_name = f"{team}.html"
+            fragment_file = os.path.join(output_dir, 'teams', fragment_name)
+            write_if_changed(fragment_file, fragment)
+            precompress(fragment_file)
+            fragment_files.add(fragment_file)
+            yield from iter_render(placeholder_template,
+                team=team,
+                count=count,
+                fragment_url=f"teams/{fragment_name}"
+            )
+
+        # Drop fragments of teams that no longer have rows
+        remove_stale_files(os.path.join(output_dir, 'teams'), fragment_files)
+
+    def iter_page():
+        """Yield the page as a stream of chunks for a file handle or an HTTP response body"""
+        if OUTPUT_MODE == 'bundle':
+            yield from iter_bundle_page()
+            return
+
+        yield from iter_render(load_component('base.html'),
+            timestamp=timestamp,
+            build_fingerprint=page_fingerprint,
+            styles_url=asset_urls['styles.css'],
+            favorites_url=asset_urls['favorites.js'],
+            live_url=asset_urls['live.js'],
+            team_options=iter_team_options(final),
+            elite_players_section=generate_elite_players_section(),
+            rolling_leaderboard_section=iter_section('rolling_leaderboard.html', (rolling_leaderboard, date_range),
+                lambda: iter_render(load_component('rolling_leaderboard.html'),
+                    date_range=date_range,
+                    rolling_leaderboard_rows=iter_rolling_leaderboard_rows(rolling_leaderboard)
+                )
+            ),
+            today_hitters_section=iter_section('today_hitters.html', (elite_leaderboard,),
+                lambda: iter_render(load_component('today_hitters.html'),
+                    today_hitters_rows=iter_individual_hitters_rows(elite_leaderboard)
+                )
+            ),
+            yesterday_hitters_section=iter_section('yesterday_hitters.html', (elite_leaderboard_day_before, yesterday),
+                lambda: iter_render(load_component('yesterday_hitters.html'),
+                    yesterday=yesterday,
+                    yesterday_hitters_rows=iter_individual_hitters_rows(elite_leaderboard_day_before)
+                )
+            ),
+            team_tables=iter_lazy_team_tables() if OUTPUT_MODE == 'fragments' else iter_cached_team_tables(),
+            extra_scripts=''
+        )
+
+    def iter_bundle_page():
+        """Write data.json and yield a page shell whose tables render.js fills in the browser"""
+        bundle = build_data_bundle(final, elite_leaderboard, elite_leaderboard_day_before, rolling_leaderboard, {
+            'timestamp': timestamp,
+            'today': today,
+            'yesterday': yesterday,
+            'date_range': date_range
+        }, row_budget=team_row_budget)
+        raw = serialize_bundle(bundle)
+        atomic_write(os.path.join(output_dir, 'data.json'), raw, mode='wb')
+        print(f"Data bundle: {len(raw)} bytes")
+
+        yield from iter_render(load_component('base.html'),
+            timestamp=timestamp,
+            build_fingerprint=page_fingerprint,
+            styles_url=asset_urls['styles.css'],
+            favorites_url=asset_urls['favorites.js'],
+            live_url=asset_urls['live.js'],
+            team_options='',
+            elite_players_section=generate_elite_players_section(),
+            rolling_leaderboard_section=iter_render(load_component('rolling_leaderboard.html'),
+                date_range=date_range,
+                rolling_leaderboard_rows=''
+            ),
+            today_hitters_section=iter_render(load_component('today_hitters.html'), today_hitters_rows=''),
+            yesterday_hitters_section=iter_render(load_component('yesterday_hitters.html'),
+                yesterday=yesterday,
+                yesterday_hitters_rows=''
+            ),
+            team_tables='',
+            extra_scripts=f'<script src="{asset_urls["render.js"]}"></script>'
+        )
+
+    # Generate HTML (skipped when the page inputs match the fingerprint of the existing page)
+    index_file = os.path.join(output_dir, 'index.html')
+    if read_page_fingerprint(index_file) == page_fingerprint:
+        print(f"HTML: page inputs unchanged, keeping existing {index_file}")
+    else:
+        try:
+            # Stream the page section by section straight into the output file
+            atomic_write_stream(index_file, iter_page())
+            prune_fragments()
+
+            print(f"Sections: {fragment_stats['hits']} reused from cache, {fragment_stats['misses']} rendered")
+            print(f"HTML saved as {index_file} - open it in your browser.")
+
+        except Exception as e:
+            print(f"Error generating HTML: {e}")
+            # Fallback to simple HTML
+            simple_html = f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <title>Almost Homers by Team</title>
+                <link rel="stylesheet" href="{asset_urls.get('styles.css', 'styles.css')}">
+            </head>
+            <body>
+                <h1>Almost Homers by Team</h1>
+                <p>Generated at {timestamp}</p>
+                <p>Found {len(final)} hits today and {len(final_day_before)} hits yesterday</p>
+                <p>Rolling leaderboard has {len(rolling_leaderboard)} players</p>
+            </body>
+            </html>
+            """
+
+            atomic_write(index_file, simple_html)
+
+            print("Fallback HTML saved due to error.")
+
+    # Keyed leaderboard rows the server diffs between builds for live updates (see live_updates.py)
+    write_if_changed(os.path.join(output_dir, LEADERBOARDS_FILE_NAME), json.dumps({
+        'version': page_fingerprint,
+        **dict(iter_live_leaderboards(rolling_leaderboard, elite_leaderboard))
+    }))
+    timer.lap('page')
+
+    # Per-date archive: every processed day keeps its own page under <site>/YYYY-MM-DD/,
+    # rewritten only when that day's data, the code or the templates change. Archive pages
+    # link the fixed-name assets because old days are never re-rendered to pick up new hashes.
+    def iter_archive_page(day_str, day_frame, day_leaderboard, day_fingerprint):
+        """Yield one archived day's page"""
+        yield from iter_render(load_component('archive_day.html'),
+            build_fingerprint=day_fingerprint,
+            date=day_str,
+            date_label=format_archive_date(day_str),
+            hit_count=len(day_frame),
+            styles_url='../styles.css',
+            favorites_url='../favorites.js',
+            team_options=iter_team_options(day_frame),
+            hitters_rows=iter_individual_hitters_rows(day_leaderboard),
+            team_tables=(html for _, _, html in iter_team_section_html(day_frame, archive_day_dir(day_str, output_dir)))
+        )
+
+    archive = load_archive_manifest(output_dir)
+    archive_before = dict(archive)
+    for day_str, day_frame, day_leaderboard in ((today, final, elite_leaderboard),
+                                                (yesterday, final_day_before, elite_leaderboard_day_before)):
+        if len(day_frame) == 0:
+            continue
+        day_page = os.path.join(archive_day_dir(day_str, output_dir), 'index.html')
+        day_fingerprint = fingerprint(
+            code_fingerprint,
+            file_fingerprint(*component_files),
+            TEAM_ROW_BUDGET,
+            TEAM_ROW_BUDGETS,
+            day_frame
+        )
+        if read_page_fingerprint(day_page) != day_fingerprint:
+            atomic_write_stream(day_page, iter_archive_page(day_str, day_frame, day_leaderboard, day_fingerprint))
+            precompress(day_page)
+            print(f"Archive: wrote {day_str}/index.html")
+        write_if_changed(os.path.join(archive_day_dir(day_str, output_dir), HITS_FILE_NAME),
+                         json.dumps(day_hit_records(day_frame)))
+        archive[day_str] = {'hits': len(day_frame), 'teams': int(day_frame['Team'].nunique())}
+
+    # Forget days whose pages were deleted by hand
+    archive = {day_str: day for day_str, day in archive.items()
+               if os.path.exists(os.path.join(archive_day_dir(day_str, output_dir), 'index.html'))}
+    archive_index = os.path.join(output_dir, ARCHIVE_INDEX_NAME)
+    if archive != archive_before or not os.path.exists(archive_index):
+        save_archive_manifest(archive, output_dir)
+        atomic_write_stream(archive_index, iter_archive_index(archive, 'styles.css'))
+        precompress(archive_index)
+        print(f"Archive: indexed {len(archive)} days in archive.html")
+    timer.lap('archive')
+
+    # Query API data (served from memory by api_index.py)
+    write_if_changed(os.path.join(output_dir, ROLLING_FILE_NAME), json.dumps(rolling_leaderboards(historical_data)))
+    season = today[:4]
+    write_if_changed(os.path.join(output_dir, SEASON_FILE_NAME), json.dumps({
+        'season': season,
+        'days': recorded_days(season),
+        'leaderboard': season_leaderboard(season)
+    }))
+    timer.lap('api_data')
+
+    # Precompressed siblings so the server never compresses at request time
+    for artifact in ('index.html', 'styles.css', 'favorites.js', 'render.js', 'live.js', 'data.json'):
+        precompress(os.path.join(output_dir, artifact))
+    timer.lap('compress')
+
+    # Only today and yesterday are processed again; older dates' entries would pile up forever
+    prune_day_stages(fingerprints, keep_days={today, yesterday})
+    save_fingerprints(fingerprints)
+    report = write_build_report(
+        output_dir, timer, fetched_at,
+        rows_fetched=len(data) + len(data_day_before),
+        bytes_fetched=int(data.memory_usage(deep=True).sum() + data_day_before.memory_usage(deep=True).sum()),
+        fragment_cache=dict(fragment_stats)
+    )
+    record_build(report)
+    print(f"Build finished in {timer.total:.1f}s: " + ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in timer.stages.items()))
@@ -0,0 +1,86 @@
+"""Production serving: the Flask app under gunicorn with several worker processes.
+
+The app, the current build's hot files and its API indexes are loaded once in the master
+before it forks, so workers start warm and share those pages copy-on-write.
+Every worker starts the refresh scheduler, but only one of them runs it at a
+time (see artifacts.py). A worker that swaps a new build in, on schedule or
+through POST /api/v1/refresh, sends the master SIGHUP, which preloads the new
+build and gracefully replaces the workers; refreshes that changed nothing
+leave the workers alone.
+Workers share their request metrics through files (see metrics.py).
+"""
+import os
+import signal
+
+from gunicorn.app.base import BaseApplication
+
+import live_updates
+import metrics
+from api_index import get_api_index
+from artifact_cache import warm_artifact_cache
+from artifacts import current_site_dir, start_refresh_scheduler
+from parallel_render import available_cpus
+
+
+def resolve_workers(workers):
+    """'auto' -> one worker per available CPU"""
+    return available_cpus() if workers == 'auto' else int(workers)
+
+
+def preload_site():
+    site_dir = current_site_dir()
+    print(f"Preloaded {warm_artifact_cache(site_dir)} files from {site_dir}")
+    index = get_api_index(site_dir)
+    print(f"Indexed {index.hit_count} hits over {len(index.days)} days for the API")
+
+
+class ProductionServer(BaseApplication):
+    """gunicorn configured in code instead of from its own command line"""
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        preload_site()
+        return self.application
+
+
+def serve_production(app, host, port, refresh_interval, workers, threads):
+    """Run app with workers processes of threads threads each until the master is stopped"""
+    def on_starting(arbiter):
+        metrics.reset_shared()
+
+    def post_worker_init(worker):
+        metrics.start_sharing()
+        # Each event stream holds a thread; keep at least half of them for page requests
+        live_updates.limit_streams(min(live_updates.MAX_STREAMS, threads // 2))
+        start_refresh_scheduler(refresh_interval, on_swap=lambda: os.kill(os.getppid(), signal.SIGHUP))
+
+    def worker_exit(arbiter, worker):
+        metrics.flush()
+
+    def child_exit(arbiter, worker):
+        metrics.fold_worker(worker.pid)
+
+    def on_reload(arbiter):
+        preload_site()
+
+    workers = resolve_workers(workers)
+    print(f"Starting {workers} workers x {threads} threads on port {port}...")
+    ProductionServer(app, {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'threads': threads,
+        'preload_app': True,
+        'on_starting': on_starting,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+        'child_exit': child_exit,
+        'on_reload': on_reload,
+    }).run()
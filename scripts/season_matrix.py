@@ -0,0 +1,244 @@
+"""Per-player daily metrics stored as memory-mapped player x day matrices.
+
+Each season lives in ../data/season/<year>/ as one fixed-width .npy file per
+metric, shaped (player capacity, 366) and indexed by dense player id and day
+of the season year. players.json maps dense ids to MLBAM ids, names and teams.
+Aggregates over any date range are then column slices with no parsing; the
+build publishes the season-to-date leaderboard for the query API this way.
+
+The elite metrics (count, best exit velo, distance and event) cover elite
+contact only, as in elite_contact_history.json, so days recorded by the
+pipeline and days migrated from the history agree. batted_balls and barrels
+cover every qualifying batted ball and are 0 (unknown) for migrated days.
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from events import EVENT_CODE_DTYPE, event_name
+from storage import file_lock, atomic_write
+
+SEASON_DIR = "../data/season"
+DAYS_PER_SEASON = 366
+INITIAL_PLAYER_CAPACITY = 1024
+
+METRICS = {
+    'elite_count': np.uint16,
+    'max_exit_velo': np.float32,  # of elite contact
+    'max_distance': np.float32,  # of elite contact
+    'best_event': EVENT_CODE_DTYPE,  # of elite contact
+    'batted_balls': np.uint16,
+    'barrels': np.uint16,
+}
+
+def season_dir(season):
+    return os.path.join(SEASON_DIR, str(season))
+
+
+def day_index(date_str):
+    """Column of a date within its season's matrices"""
+    return datetime.strptime(date_str, '%Y-%m-%d').timetuple().tm_yday - 1
+
+
+def load_player_registry(season):
+    """Load the dense id registry for a season
+
+    Returns a dict with parallel 'mlbam_ids', 'names' and 'teams' lists (index = dense id)
+    and an 'index' dict mapping MLBAM id to dense id.
+    """
+    path = os.path.join(season_dir(season), "players.json")
+    registry = {'mlbam_ids': [], 'names': [], 'teams': []}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            registry = json.load(f)
+    registry['index'] = {mlbam: dense for dense, mlbam in enumerate(registry['mlbam_ids'])}
+    return registry
+
+
+def save_player_registry(season, registry):
+    data = {key: registry[key] for key in ('mlbam_ids', 'names', 'teams')}
+    atomic_write(os.path.join(season_dir(season), "players.json"), json.dumps(data))
+
+
+def register_player(registry, mlbam_id, name, team):
+    """Return the dense id for an MLBAM id, adding the player to the registry if needed"""
+    mlbam_id = int(mlbam_id)
+    dense = registry['index'].get(mlbam_id)
+    if dense is None:
+        dense = len(registry['mlbam_ids'])
+        registry['mlbam_ids'].append(mlbam_id)
+        registry['names'].append(name)
+        registry['teams'].append(team)
+        registry['index'][mlbam_id] = dense
+    else:
+        # Keep the latest name/team (trades, name corrections)
+        registry['names'][dense] = name
+        registry['teams'][dense] = team
+    return dense
+
+
+def open_season_matrix(season, mode='r'):
+    """Memory-map every metric matrix of a season
+
+    Returns {metric: memmap}, or {} when the season has no data yet (read mode).
+    """
+    matrices = {}
+    for metric in METRICS:
+        path = os.path.join(season_dir(season), f"{metric}.npy")
+        if not os.path.exists(path):
+            return {}
+        matrices[metric] = np.load(path, mmap_mode=mode)
+    return matrices
+
+
+def _ensure_capacity(season, player_count):
+    """Create or grow the metric files so they hold at least player_count rows"""
+    directory = season_dir(season)
+    os.makedirs(directory, exist_ok=True)
+    for metric, dtype in METRICS.items():
+        path = os.path.join(directory, f"{metric}.npy")
+        current = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        capacity = current.shape[0] if current is not None else 0
+        if current is not None and capacity >= player_count:
+            continue
+
+        new_capacity = max(capacity, INITIAL_PLAYER_CAPACITY)
+        while new_capacity < player_count:
+            new_capacity *= 2
+
+        # Grow into a temp file and rename it so readers never see a half-copied matrix
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(new_capacity, DAYS_PER_SEASON))
+        if current is not None:
+            grown[:capacity] = current
+        grown.flush()
+        del grown, current
+        os.replace(tmp_path, path)
+
+
+def record_day(date_str, day_frame, barrel_flags):
+    """Aggregate one day's processed Statcast frame per player and write it into the season matrices
+
+    day_frame has one row per qualifying batted ball and barrel_flags is a boolean
+    Series aligned with it.
+    """
+    frame = day_frame[['Batter ID', 'Batter', 'Team', 'Exit Velo', 'Distance (ft)', 'Event Code']].copy()
+    frame['barrel'] = barrel_flags.astype(bool).values
+    frame['elite'] = (frame['Exit Velo'] > 95) & (frame['Distance (ft)'] > 200)
+    # Maxima over elite contact only (NaN drops out of max), matching the history
+    for column in ('Exit Velo', 'Distance (ft)', 'Event Code'):
+        frame[f'elite {column}'] = frame[column].where(frame['elite'])
+
+    per_player = frame.groupby('Batter ID').agg(
+        batter=('Batter', 'last'),
+        team=('Team', 'last'),
+        batted_balls=('Exit Velo', 'size'),
+        barrels=('barrel', 'sum'),
+        elite_count=('elite', 'sum'),
+        max_exit_velo=('elite Exit Velo', 'max'),
+        max_distance=('elite Distance (ft)', 'max'),
+        best_event=('elite Event Code', 'max'),
+    ).reset_index()
+    per_player[['max_exit_velo', 'max_distance', 'best_event']] = \
+        per_player[['max_exit_velo', 'max_distance', 'best_event']].fillna(0)
+    per_player['mlbam_id'] = per_player['Batter ID']
+    per_player['name'] = per_player['batter'].str.split('> ').str[-1]
+
+    return write_day_rows(date_str, per_player)
+
+
+def write_day_rows(date_str, rows):
+    """Rewrite one day's column of the season matrices
+
+    rows is a DataFrame with one row per player holding 'mlbam_id', 'name', 'team'
+    and a column for every metric in METRICS. Returns the number of players written.
+    """
+    season = date_str[:4]
+    day = day_index(date_str)
+
+    with file_lock(os.path.join(season_dir(season), "matrix.lock")):
+        registry = load_player_registry(season)
+        dense_ids = np.array([
+            register_player(registry, mlbam_id, name, team)
+            for mlbam_id, name, team in zip(rows['mlbam_id'], rows['name'], rows['team'])
+        ], dtype=np.int64)
+
+        _ensure_capacity(season, len(registry['mlbam_ids']))
+        matrices = open_season_matrix(season, mode='r+')
+        for metric, dtype in METRICS.items():
+            column = matrices[metric][:, day]
+            column[:] = 0
+            if len(dense_ids) > 0:
+                column[dense_ids] = rows[metric].to_numpy().astype(dtype)
+            matrices[metric].flush()
+
+        save_player_registry(season, registry)
+
+    return len(dense_ids)
+
+
+def day_has_data(date_str):
+    """Whether any player has batted balls or elite contact recorded for a date"""
+    matrices = open_season_matrix(date_str[:4])
+    if not matrices:
+        return False
+    day = day_index(date_str)
+    return bool(matrices['batted_balls'][:, day].any() or matrices['elite_count'][:, day].any())
+
+
+def range_leaderboard(start_date, end_date, limit=None):
+    """Elite contact per player over an inclusive date range within one season
+
+    Returns rows shaped like the rolling leaderboard's in rolling.json, plus the
+    batted balls and barrels recorded over the range, sorted by elite count then
+    best exit velocity.
+    """
+    season = start_date[:4]
+    matrices = open_season_matrix(season)
+    if not matrices:
+        return []
+
+    registry = load_player_registry(season)
+    players = len(registry['mlbam_ids'])
+    days = slice(day_index(start_date), day_index(end_date) + 1)
+
+    elite = matrices['elite_count'][:players, days].astype(np.int32)
+    total_count = elite.sum(axis=1)
+    days_active = (elite > 0).sum(axis=1)
+    best_exit_velo = matrices['max_exit_velo'][:players, days].max(axis=1, initial=0)
+    best_distance = matrices['max_distance'][:players, days].max(axis=1, initial=0)
+    best_event = matrices['best_event'][:players, days].max(axis=1, initial=0)
+    batted_balls = matrices['batted_balls'][:players, days].sum(axis=1, dtype=np.int64)
+    barrels = matrices['barrels'][:players, days].sum(axis=1, dtype=np.int64)
+
+    ranked = np.flatnonzero(total_count > 0)
+    order = np.lexsort((-best_exit_velo[ranked], -total_count[ranked]))
+    return [{
+        'player_id': registry['mlbam_ids'][dense],
+        'player': registry['names'][dense],
+        'team': registry['teams'][dense],
+        'total_count': int(total_count[dense]),
+        'best_exit_velo': round(float(best_exit_velo[dense]), 1),
+        'best_distance': float(best_distance[dense]),
+        'best_event': event_name(best_event[dense]),
+        'days_active': int(days_active[dense]),
+        'batted_balls': int(batted_balls[dense]),
+        'barrels': int(barrels[dense])
+    } for dense in ranked[order][:limit]]
+
+
+def season_leaderboard(season, limit=None):
+    """Whole-season elite contact leaderboard (see range_leaderboard)"""
+    return range_leaderboard(f"{season}-01-01", f"{season}-12-31", limit=limit)
+
+
+def recorded_days(season):
+    """Dates of a season with any data recorded, in order"""
+    matrices = open_season_matrix(season)
+    if not matrices:
+        return []
+    recorded = matrices['batted_balls'].any(axis=0) | matrices['elite_count'].any(axis=0)
+    start = datetime(int(season), 1, 1).toordinal()
+    return [datetime.fromordinal(start + day).strftime('%Y-%m-%d') for day in np.flatnonzero(recorded)]
@@ -0,0 +1,347 @@
+"""HTML section builders.
+
+Every section is a generator of HTML chunks so the page can be streamed to a
+file handle or an HTTP response without holding the whole document in memory.
+"""
+import math
+import re
+
+import pandas as pd
+
+from templates import load_component, iter_render
+
+LOGO_TEAM_RE = re.compile(r'/teamlogos/mlb/\d+/(\w+)\.png')
+
+def get_exit_velo_color(velo):
+    if velo > 98:
+        return 'background-color: #8B0000; color: #FFD700; font-weight: bold; box-shadow: 0 0 10px #FFD700; border: 2px solid #FFD700'
+    elif velo > 94:
+        return 'background-color: #FF0000'
+    else:
+        return 'background-color: #FFB6C1'
+
+def is_barrel(exit_velo, launch_angle):
+    """Check if a ball qualifies as a barrel"""
+    if exit_velo < 98:
+        return False
+    
+    # Barrel qualification ranges based on exit velocity
+    barrel_ranges = {
+        98: (26, 30),
+        99: (25, 31),
+        100: (24, 33),
+        101: (23, 34),
+        102: (22, 36),
+        103: (21, 37),
+        104: (20, 38),
+        105: (19, 39),
+        106: (18, 41)
+    }
+    
+    # For 107+ mph, use the widest range
+    if exit_velo >= 107:
+        min_angle, max_angle = 8, 50
+    else:
+        # Find the appropriate range for this exit velocity
+        ev_floor = int(exit_velo)
+        if ev_floor in barrel_ranges:
+            min_angle, max_angle = barrel_ranges[ev_floor]
+        else:
+            # For speeds between defined ranges, use the lower speed's range
+            for speed in sorted(barrel_ranges.keys(), reverse=True):
+                if exit_velo >= speed:
+                    min_angle, max_angle = barrel_ranges[speed]
+                    break
+            else:
+                return False
+    
+    return min_angle <= launch_angle <= max_angle
+
+def get_launch_angle_color(angle, exit_velo):
+    """Get launch angle color based on angle and exit velocity"""
+    if is_barrel(exit_velo, angle):
+        return 'background-color: #FF6B35'  # Orange for barrel
+    elif 31 <= angle <= 35:
+        return 'background-color: #006400'  # Dark green
+    elif 20 <= angle <= 30:
+        return 'background-color: #00FF00'  # Green
+    elif 14 <= angle <= 19:
+        return 'background-color: #90EE90'  # Light green
+    elif 8 <= angle <= 13:
+        return 'background-color: #FFFF00'  # Yellow
+    else:  # Below 8 or above 35
+        return 'background-color: #FF0000'  # Red
+
+def parse_batter_key(batter_with_logo):
+    """Split a '<img src=".../bal.png" ...> Ryan Mountcastle' batter cell into (name, team)"""
+    name = batter_with_logo.split('> ')[-1].strip()
+    match = LOGO_TEAM_RE.search(batter_with_logo)
+    team = match.group(1).upper() if match else ''
+    return name, team
+
+def format_player_row(player_data, is_elite=False):
+    """Format a player row for HTML tables"""
+    batter_with_logo = str(player_data.get('Batter', ''))
+    player_name = batter_with_logo.split('> ')[-1] if '> ' in batter_with_logo else batter_with_logo
+    
+    # Extract team logo
+    team_logo = ""
+    if 'src="' in batter_with_logo:
+        start = batter_with_logo.find('src="') + 5
+        end = batter_with_logo.find('"', start)
+        logo_url = batter_with_logo[start:end]
+        team_logo = f'<img src="{logo_url}" width="20" style="vertical-align:middle; margin-right: 8px;">'
+    
+    styled_player_name = f'<span class="leaderboard-player-name">{player_name}</span>'
+    
+    return {
+        'player_name': player_name,
+        'team_logo': team_logo,
+        'styled_player_name': styled_player_name,
+        'batter_with_logo': batter_with_logo
+    }
+
+def generate_elite_players_section():
+    """Generate elite players section (placeholder - would implement full logic)"""
+    return '<p>No elite players found with current criteria</p>'
+
+def iter_rolling_leaderboard_rows(rolling_leaderboard):
+    """Yield the rolling leaderboard rows"""
+    for player_data in rolling_leaderboard[:25]:
+        player_info = format_player_row(player_data)
+        
+        event_text = str(player_data['Best_Event']).replace('_', ' ').title()
+        row_class = ""
+        star_prefix = ""
+        
+        if player_data['Best_Event'] == 'triple':
+            row_class = 'style="background-color: rgba(0, 255, 0, 0.2); border-left: 3px solid #00FF00;"'
+            star_prefix = "⭐ "
+        elif player_data['Best_Event'] == 'double':
+            row_class = 'style="background-color: rgba(0, 200, 0, 0.2); border-left: 3px solid #00AA00;"'
+            star_prefix = "⭐ "
+        elif player_data['Best_Event'] == 'single':
+            row_class = 'style="background-color: rgba(255, 255, 0, 0.2); border-left: 3px solid #FFFF00;"'
+        
+        yield f"""
+                        <tr {row_class}>
+                            <td data-label="♥" style="text-align: center;"><button class="heart-btn" data-player="{player_info['player_name']}" data-logo="{player_info['team_logo'].replace('"', '&quot;')}" onclick="toggleFavoriteBtn(this)">♡</button></td>
+                            <td data-label="Player"><div class="batter-cell">{player_info['team_logo']}{player_info['styled_player_name']}</div></td>
+                            <td data-label="# Times Elite Contact" style="text-align: center; font-weight: bold; color: #4CAF50;">{player_data['Total_Count']}</td>
+                            <td data-label="Best Exit Velo" style="text-align: center; {get_exit_velo_color(player_data['Best_Exit_Velo'])}">{player_data['Best_Exit_Velo']} mph</td>
+                            <td data-label="Best Distance" style="text-align: center;">{int(player_data['Best_Distance'])} ft</td>
+                            <td data-label="Best Event" style="text-align: center;">{star_prefix}{event_text}</td>
+                            <td data-label="Days Active" style="text-align: center; color: #FFA500;">{player_data['Days_Active']}</td>
+                        </tr>
+        """
+
+def order_individual_hits(elite_data):
+    """Return the top 50 individual hits as records, grouped by player with the most elite hits first"""
+    if len(elite_data) == 0:
+        return []
+    
+    # Group by player and sort by count, but show all individual hits
+    player_order = elite_data.groupby('Batter')['Count'].first().sort_values(ascending=False).index.tolist()
+    
+    # Reconstruct the dataframe with players grouped together
+    grouped_rows = []
+    for player in player_order:
+        player_hits = elite_data[elite_data['Batter'] == player].sort_values('Exit Velo', ascending=False)
+        grouped_rows.extend(player_hits.to_dict('records'))
+    
+    return grouped_rows[:50]  # Show top 50 individual hits
+
+def iter_individual_hitters_rows(elite_data):
+    """Yield the individual hitter rows for today/yesterday"""
+    if len(elite_data) == 0:
+        yield '<tr><td colspan="5" style="text-align: center; color: #7f8c8d; font-style: italic; padding: 20px;">No elite contact hits found for this date</td></tr>'
+        return
+    
+    for row in order_individual_hits(elite_data):
+        # Extract player info
+        batter_with_logo = str(row['Batter'])
+        player_name = batter_with_logo.split('> ')[-1] if '> ' in batter_with_logo else batter_with_logo
+        
+        # Extract team logo
+        team_logo = ""
+        if 'src="' in batter_with_logo:
+            start = batter_with_logo.find('src="') + 5
+            end = batter_with_logo.find('"', start)
+            logo_url = batter_with_logo[start:end]
+            team_logo = f'<img src="{logo_url}" width="20" style="vertical-align:middle; margin-right: 8px;">'
+        
+        event_text = str(row['Event']).replace('_', ' ').title() if str(row['Event']) != 'nan' else 'In Play'
+        
+        # Determine event styling
+        row_class = ""
+        star_prefix = ""
+        if row['Event'] == 'triple':
+            row_class = 'style="background-color: rgba(0, 255, 0, 0.2); border-left: 3px solid #00FF00;"'
+            star_prefix = "⭐ "
+        elif row['Event'] == 'double':
+            row_class = 'style="background-color: rgba(0, 200, 0, 0.2); border-left: 3px solid #00AA00;"'
+            star_prefix = "⭐ "
+        elif row['Event'] == 'single':
+            row_class = 'style="background-color: rgba(255, 255, 0, 0.2); border-left: 3px solid #FFFF00;"'
+        
+        # Style the player name
+        styled_player_name = f'<span class="leaderboard-player-name">{player_name}</span>'
+        
+        yield f"""
+                        <tr {row_class}>
+                            <td data-label="♥" style="text-align: center;"><button class="heart-btn" data-player="{player_name}" data-logo="{team_logo.replace('"', '&quot;')}" onclick="toggleFavoriteBtn(this)">♡</button></td>
+                            <td data-label="Player"><div class="batter-cell">{team_logo}{styled_player_name}</div></td>
+                            <td data-label="Exit Velo" style="text-align: center; {get_exit_velo_color(row['Exit Velo'])}">{row['Exit Velo']} mph</td>
+                            <td data-label="Distance" style="text-align: center;">{int(row['Distance (ft)'])} ft</td>
+                            <td data-label="Event" style="text-align: center;">{star_prefix}{event_text}</td>
+                        </tr>
+        """
+
+def keyed_rows(batters, rows):
+    """Pair rendered rows with the keys live.js finds them by: player name plus #n for the player's nth row
+
+    A table without players (just the "no hits" row) gets the empty key.
+    """
+    rows = list(rows)
+    if not batters:
+        return [['', row] for row in rows[:1]]
+    seen = {}
+    keyed = []
+    for batter, row in zip(batters, rows):
+        name = str(batter).split('> ')[-1]
+        keyed.append([f"{name}#{seen.get(name, 0)}", row])
+        seen[name] = seen.get(name, 0) + 1
+    return keyed
+
+def iter_live_leaderboards(rolling_leaderboard, elite_data):
+    """Yield (section, keyed rows) of the leaderboards live.js keeps up to date"""
+    yield 'rolling', keyed_rows([row['Batter'] for row in rolling_leaderboard[:25]],
+                                iter_rolling_leaderboard_rows(rolling_leaderboard))
+    yield 'today', keyed_rows([row['Batter'] for row in order_individual_hits(elite_data)],
+                              iter_individual_hitters_rows(elite_data))
+
+def team_columns(team_data):
+    """One team's rows as plain columns, hardest hit first
+
+    Numeric columns are numpy arrays and text columns are lists, which pickle
+    far smaller and faster than a DataFrame when shipped to a render worker.
+    """
+    ordered = team_data.sort_values('Exit Velo', ascending=False)
+    return {
+        'batter': [str(batter) for batter in ordered['Batter']],
+        'exit_velo': ordered['Exit Velo'].to_numpy(),
+        'launch_angle': ordered['Launch Angle'].to_numpy(),
+        'bat_speed': ordered['Bat Speed'].to_numpy(),
+        'distance': ordered['Distance (ft)'].to_numpy(),
+        'event': [str(event) for event in ordered['Event']]
+    }
+
+def iter_team_column_rows(columns):
+    """Yield one team's batted ball rows from team_columns()"""
+    for batter_html, exit_velo, launch_angle, bat_speed, distance, event in zip(
+            columns['batter'], columns['exit_velo'], columns['launch_angle'],
+            columns['bat_speed'], columns['distance'], columns['event']):
+        event_text = event.replace('_', ' ').title() if event != 'nan' else 'In Play'
+        
+        # Extract player name for styling
+        if '> ' in batter_html:
+            logo_part = batter_html.split('> ')[0] + '> '
+            name_part = batter_html.split('> ')[1]
+            styled_batter = f'{logo_part}<span class="player-name">{name_part}</span>'
+        else:
+            styled_batter = f'<span class="player-name">{batter_html}</span>'
+        
+        # Calculate proper coloring
+        exit_velo_style = get_exit_velo_color(exit_velo)
+        launch_angle_style = get_launch_angle_color(launch_angle, exit_velo)
+        is_barrel_hit = is_barrel(exit_velo, launch_angle)
+        barrel_indicator = '🛢️' if is_barrel_hit else ''
+        
+        yield f"""
+                        <tr>
+                            <td data-label="Batter"><div class="batter-cell">{styled_batter}</div></td>
+                            <td data-label="Exit Velo"><div class="exit-velo" style="{exit_velo_style}">{exit_velo}</div></td>
+                            <td data-label="Launch Angle"><div class="launch-angle" style="{launch_angle_style}">{launch_angle}°</div></td>
+                            <td data-label="Bat Speed"><div class="bat-speed-cell">{bat_speed if pd.notna(bat_speed) else 'N/A'}</div></td>
+                            <td data-label="Barrel"><div class="barrel-cell">{barrel_indicator}</div></td>
+                            <td data-label="HR/Park"><div class="hr-prob-cell">0/30</div></td>
+                            <td data-label="Distance"><div class="distance-cell">{distance} ft</div></td>
+                            <td data-label="Event"><div class="event-cell">{event_text}</div></td>
+                        </tr>
+                """
+
+def slice_columns(columns, start, stop):
+    """Rows start:stop of team_columns()"""
+    return {name: values[start:stop] for name, values in columns.items()}
+
+def team_page_count(row_count, row_budget):
+    """Number of fetch-on-demand pages for rows beyond the inline budget (a budget of 0 means no limit)"""
+    if not row_budget or row_count <= row_budget:
+        return 0
+    return math.ceil((row_count - row_budget) / row_budget)
+
+def team_page_dir(team):
+    """Relative URL prefix of a team's overflow pages"""
+    return f"pages/{team}/"
+
+def team_page_url(team, page):
+    """Relative URL of one page of a team's overflow rows, numbered from 1"""
+    return f"{team_page_dir(team)}{page}.html"
+
+def team_section_payload(team, team_data, row_budget=0):
+    """Pre-partitioned inputs of one team section: (team, formatted stats, columns, row budget)"""
+    stats = {
+        'count': len(team_data),
+        'avg_distance': f"{team_data['Distance (ft)'].mean():.0f}",
+        'max_distance': f"{team_data['Distance (ft)'].max():.0f}",
+        'avg_exit_velo': f"{team_data['Exit Velo'].mean():.1f}"
+    }
+    return team, stats, team_columns(team_data), row_budget
+
+def iter_more_rows_button(team, row_count, row_budget):
+    """Yield the button that fetches a team's overflow pages, if it has any"""
+    page_count = team_page_count(row_count, row_budget)
+    if page_count == 0:
+        return
+    yield from iter_render(load_component('team_more_rows.html'),
+        page_url=team_page_dir(team),
+        page_count=page_count,
+        page_size=row_budget,
+        remaining=row_count - row_budget
+    )
+
+def iter_team_section_payload(team, stats, columns, row_budget=0):
+    """Yield one team's section from team_section_payload(), with only the first row_budget rows inline"""
+    yield from iter_render(load_component('team_section.html'),
+        team=team,
+        team_rows=iter_team_column_rows(slice_columns(columns, 0, row_budget) if row_budget else columns),
+        more_rows=iter_more_rows_button(team, stats['count'], row_budget),
+        **stats
+    )
+
+def render_team_section(payload):
+    """Render one team section and its overflow pages to strings (the process pool entry point)
+
+    Returns [section, page 1, page 2, ...]; pages hold bare table rows.
+    """
+    team, stats, columns, row_budget = payload
+    pages = [''.join(iter_team_section_payload(*payload))]
+    for page in range(1, team_page_count(stats['count'], row_budget) + 1):
+        page_columns = slice_columns(columns, page * row_budget, (page + 1) * row_budget)
+        pages.append(''.join(iter_team_column_rows(page_columns)))
+    return pages
+
+def iter_team_partitions(final):
+    """Yield (team, team rows) in team order"""
+    teams = final['Team'].unique() if len(final) > 0 else []
+    
+    for team in sorted(teams):
+        team_data = final[final['Team'] == team]
+        if len(team_data) > 0:
+            yield team, team_data
+
+def iter_team_options(final):
+    """Yield the team filter dropdown options"""
+    teams = final['Team'].unique() if len(final) > 0 else []
+    for team in sorted(teams):
+        yield f'                <option value="{team}">{team}</option>\n'
@@ -0,0 +1,303 @@
+"""Flask server for the built site.
+
+Only serves files a build already wrote, so it starts instantly from the last
+build without importing the data pipeline. Files come from the current
+artifact (see artifacts.py), which the refresh scheduler swaps atomically.
+"""
+import hmac
+import mimetypes
+import os
+import time
+
+from flask import Flask, Response, send_from_directory, request, abort, g
+from werkzeug.security import safe_join
+
+import metrics
+from api_index import ApiQueryError, get_api_index, parse_limit, parse_number
+from artifact_cache import get_artifact
+from compression import negotiate
+from archive import archive_day_dir, is_archive_date
+from artifacts import REFRESH_INTERVAL, current_site_dir, request_refresh, seconds_since_refresh, start_refresh_scheduler
+from live_updates import iter_events
+from build_report import BUILD_REPORT_NAME, parse_build_report, seconds_since
+
+app = Flask(__name__, static_folder=None)  # /static serves the hashed build assets
+
+def stale_age(refresh_interval):
+    """Build age from which the served build counts as stale (0 = never): by default three missed refreshes
+
+    Without refreshes the build never gets newer, so its age says nothing about missed updates.
+    """
+    if refresh_interval <= 0:
+        return 0
+    return int(os.environ.get('ALMOSTHOMERS_STALE_AGE', str(3 * refresh_interval)))
+
+# Set again by serve() from the refresh interval actually in use
+STALE_AGE = stale_age(REFRESH_INTERVAL)
+# Bearer token for POST /api/v1/refresh; manual refreshes are off without one
+REFRESH_TOKEN = os.environ.get('ALMOSTHOMERS_REFRESH_TOKEN', '')
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('almosthomers_http_request_duration_seconds', time.perf_counter() - g.request_started,
+                    route=route, status=response.status_code)
+    return response
+
+def send_precompressed(directory, filename, max_age=None):
+    """Send the best precompressed sibling of a file the client accepts, falling back to the plain file
+
+    Bodies come from memory (artifact_cache) with a strong ETag and
+    Last-Modified, and conditional requests are answered with a 304.
+    """
+    path = safe_join(directory, filename)
+    if path is None:
+        abort(404)
+    try:
+        entry = get_artifact(current_site_dir(), path)
+    except (FileNotFoundError, IsADirectoryError):
+        abort(404)
+    if entry is None:
+        return send_from_disk(directory, filename, max_age)
+
+    encoding, suffix = negotiate(request.headers.get('Accept-Encoding'), set(entry.bodies) - {''})
+    response = Response(entry.bodies[suffix], mimetype=mimetypes.guess_type(filename)[0])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(entry.etag_for(suffix))
+    response.last_modified = entry.last_modified
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def send_from_disk(directory, filename, max_age=None):
+    """send_precompressed for files too large to keep in memory"""
+    path = safe_join(directory, filename)
+    available = {suffix for suffix in ('.br', '.gz') if os.path.exists(path + suffix)}
+    encoding, suffix = negotiate(request.headers.get('Accept-Encoding'), available)
+    response = send_from_directory(directory, filename + suffix, mimetype=mimetypes.guess_type(filename)[0], max_age=max_age)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/')
+def serve_html():
+    return send_precompressed(current_site_dir(), 'index.html')
+
+@app.route('/static/<path:filename>')
+def serve_static_asset(filename):
+    # Hashed names change with their contents, so they never need revalidating
+    response = send_precompressed(os.path.join(current_site_dir(), 'static'), filename, max_age=31536000)
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/styles.css')
+def serve_css():
+    return send_precompressed(current_site_dir(), 'styles.css')
+
+@app.route('/favorites.js')
+def serve_js():
+    return send_precompressed(current_site_dir(), 'favorites.js')
+
+@app.route('/render.js')
+def serve_render_js():
+    return send_precompressed(current_site_dir(), 'render.js')
+
+@app.route('/live.js')
+def serve_live_js():
+    return send_precompressed(current_site_dir(), 'live.js')
+
+@app.route('/data.json')
+def serve_data_bundle():
+    return send_precompressed(current_site_dir(), 'data.json')
+
+@app.route('/teams/<path:filename>')
+def serve_team_fragment(filename):
+    return send_precompressed(os.path.join(current_site_dir(), 'teams'), filename)
+
+@app.route('/pages/<path:filename>')
+def serve_team_page(filename):
+    return send_precompressed(os.path.join(current_site_dir(), 'pages'), filename)
+
+@app.route('/archive.html')
+def serve_archive_index():
+    return send_precompressed(current_site_dir(), 'archive.html')
+
+@app.route('/<day>/', defaults={'filename': 'index.html'})
+@app.route('/<day>/<path:filename>')
+def serve_archive_day(day, filename):
+    if not is_archive_date(day):
+        abort(404)
+    return send_precompressed(archive_day_dir(day, current_site_dir()), filename)
+
+def cached_query(index, key, answer):
+    """Answer an API query with index's cached bytes for key, calling answer() -> (payload, status) on a miss"""
+    cached = index.responses.get(key)
+    if cached is None:
+        payload, status = answer()
+        cached = (app.json.response(payload).get_data(), status)
+        index.responses.put(key, *cached)
+    body, status = cached
+    return Response(body, status=status, mimetype='application/json')
+
+@app.route('/api/v1/hits')
+def api_hits():
+    args = request.args
+    index = get_api_index(current_site_dir())
+    date, team = index.normalize_hits_query(args.get('date') or None, args.get('team') or None)
+    min_ev = parse_number('min_ev', args.get('min_ev'))
+    limit = parse_limit(args.get('limit'))
+    return cached_query(index, ('hits', date, team, min_ev, limit),
+                        lambda: (index.query_hits(date, team, min_ev, limit), 200))
+
+@app.route('/api/v1/leaderboard/rolling')
+def api_rolling_leaderboard():
+    index = get_api_index(current_site_dir())
+    window = parse_number('window', request.args.get('window'), int)
+    window = len(index.rolling_days) if window is None else window
+    return cached_query(index, ('rolling', window), lambda: (index.query_rolling(window), 200))
+
+@app.route('/api/v1/leaderboard/season')
+def api_season_leaderboard():
+    index = get_api_index(current_site_dir())
+    limit = parse_limit(request.args.get('limit'))
+    return cached_query(index, ('season', limit), lambda: (index.query_season(limit), 200))
+
+@app.route('/api/v1/players/<int:player_id>')
+def api_player(player_id):
+    index = get_api_index(current_site_dir())
+
+    def answer():
+        player = index.query_player(player_id)
+        if player is None:
+            return {'error': f"no hits for player {player_id}"}, 404
+        return player, 200
+
+    return cached_query(index, ('player', player_id), answer)
+
+@app.errorhandler(ApiQueryError)
+def api_query_error(error):
+    return {'error': str(error)}, 400
+
+@app.route('/api/v1/events')
+def leaderboard_events():
+    # EventSource sends the last event id when it reconnects; the page passes its own version the first time
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    return Response(iter_events(since), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/v1/refresh', methods=['POST'])
+def manual_refresh():
+    """Start a background refresh, or attach to the one already pending or running"""
+    if not REFRESH_TOKEN:
+        return {'error': "manual refresh is disabled (set ALMOSTHOMERS_REFRESH_TOKEN)"}, 403
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {REFRESH_TOKEN}"):
+        return {'error': "missing or wrong bearer token"}, 401
+    _, attached = request_refresh("manual request")
+    return {'status': 'attached' if attached else 'started', 'serving': os.path.basename(current_site_dir())}, 202
+
+@app.route('/api/v1/healthz')
+def health_check():
+    return {'status': 'healthy'}, 200
+
+def load_build_report(site_dir):
+    """The served build's build.json report, or None if it has none"""
+    try:
+        return parse_build_report(get_artifact(site_dir, os.path.join(site_dir, BUILD_REPORT_NAME)).bodies[''])
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+def is_stale(build_age):
+    """Whether a build of this age is past STALE_AGE"""
+    return bool(STALE_AGE) and build_age > STALE_AGE
+
+@app.route('/api/v1/readyz')
+def readiness_check():
+    """Ready once the current build is loaded into memory
+
+    An old build is still served, so staleness (a failing Statcast fetch,
+    say) is reported in the body and as a metric rather than taking every
+    replica out of rotation.
+    """
+    site_dir = current_site_dir()
+    since_attempt = seconds_since_refresh()
+    status = {
+        'status': 'not ready',
+        'build': os.path.basename(site_dir),
+        'seconds_since_refresh_attempt': round(since_attempt) if since_attempt != float('inf') else None,
+        'stale_after_seconds': STALE_AGE
+    }
+    try:
+        get_artifact(site_dir, os.path.join(site_dir, 'index.html'))
+    except (FileNotFoundError, IsADirectoryError):
+        status['reason'] = "no build loaded yet"
+        return status, 503
+    get_api_index(site_dir)
+    status['status'] = 'ready'
+    report = load_build_report(site_dir)
+    if report is None:
+        # A checked-out almosthomers/ has no build.json (it isn't committed), so its age is unknown
+        status['stale'] = None
+        status['stale_reason'] = "build age unknown until the first refresh writes build.json"
+        return status, 200
+
+    build_age = seconds_since(report['finished_at'])
+    status.update(
+        build_age_seconds=round(build_age),
+        stale=is_stale(build_age),
+        finished_at=report['finished_at'],
+        fetched_at=report['fetched_at'],
+        seconds_since_fetch=round(seconds_since(report['fetched_at'])),
+        rows_fetched=report['rows_fetched'],
+        build_duration_seconds=report['duration_seconds'],
+        stages=report['stages']
+    )
+    if status['stale']:
+        status['stale_reason'] = "build is older than the stale age; refreshes are failing or not running"
+    return status, 200
+
+@app.route('/metrics')
+def serve_metrics():
+    site_dir = current_site_dir()
+    gauges = {}
+    report = load_build_report(site_dir)
+    if report is not None:
+        build_age = seconds_since(report['finished_at'])
+        gauges['almosthomers_build_age_seconds'] = round(build_age)
+        gauges['almosthomers_build_stale'] = int(is_stale(build_age))
+        if 'artifact_bytes' in report:
+            gauges['almosthomers_artifact_bytes'] = report['artifact_bytes']
+    body = ''.join(metrics.iter_exposition(metrics.collect(), gauges))
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+def serve(host='0.0.0.0', port=5000, refresh_interval=REFRESH_INTERVAL, workers=0, threads=4):
+    """Serve the last built site, refreshing it in the background every refresh_interval seconds
+
+    workers=0 runs Flask's single-process development server; a number (or
+    'auto', one per available CPU) runs that many gunicorn worker processes.
+    """
+    global STALE_AGE
+    STALE_AGE = stale_age(refresh_interval)
+    site_dir = current_site_dir()
+    if not os.path.exists(os.path.join(site_dir, 'index.html')):
+        print(f"No built page in {site_dir} yet - run the build subcommand")
+    if workers not in (0, '0'):
+        try:
+            from production import serve_production
+        except ImportError:
+            print("gunicorn isn't installed - falling back to the development server")
+        else:
+            serve_production(app, host, port, refresh_interval, workers, threads)
+            return
+    start_refresh_scheduler(refresh_interval)
+    print(f"Starting web server on port {port}...")
+    app.run(host=host, port=port, debug=False)
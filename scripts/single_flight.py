@@ -0,0 +1,87 @@
+"""Single-flight rebuilds: however many triggers fire, one build runs at a time.
+
+Rebuilds are triggered by the refresh schedule (including right after a pod
+restarts with stale data), POST /api/v1/refresh, and the build command run
+from cron or the GitHub workflow. A trigger that arrives while a build is
+pending or running attaches to that build instead of starting another one,
+and the first trigger waits a short debounce so a burst becomes one build.
+
+Across processes the build runs under a file lock whose mtime records when
+the last build attempt finished, successful or not. A process that gets the
+lock after another one has finished an attempt since its first trigger skips
+its own, so triggers in different workers coalesce too, and a failing build
+(Statcast down, say) is tried once per burst rather than once per waiter.
+"""
+import os
+import threading
+import time
+import traceback
+
+import metrics
+from storage import file_lock
+
+
+class SingleFlight:
+    """Coalesce triggers of run() into one call at a time, in this process and across processes sharing lock_path"""
+
+    def __init__(self, name, run, lock_path, debounce=0):
+        self.name = name
+        self.run = run
+        self.lock_path = lock_path
+        self.debounce = debounce
+        self.last_result = None
+        self._cond = threading.Condition()
+        self._triggered_at = None  # first trigger the pending flight answers
+        self._running = False
+        self._flights = 0  # flights finished in this process
+
+    def trigger(self, reason):
+        """Ask for a build; returns (ticket for wait(), whether it attached to a pending or running build)"""
+        with self._cond:
+            attached = self._running or self._triggered_at is not None
+            if not attached:
+                os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+                open(self.lock_path, 'a').close()  # creating it later would look like a finished build
+                self._triggered_at = time.time()
+                threading.Thread(target=self._fly, name=f"{self.name.lower()}-flight", daemon=True).start()
+            ticket = self._flights + 1
+        metrics.inc('almosthomers_rebuild_triggers_total', outcome='attached' if attached else 'started')
+        print(f"{self.name}: {reason} {'attached to the pending build' if attached else 'started a build'}")
+        return ticket, attached
+
+    def wait(self, ticket, timeout=None):
+        """Block until the flight of ticket has finished; the latest flight's result, or None on timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._flights >= ticket, timeout):
+                return None
+            return self.last_result
+
+    def _fly(self):
+        time.sleep(self.debounce)
+        with self._cond:
+            triggered_at, self._triggered_at = self._triggered_at, None
+            self._running = True
+        result = 'failed'
+        try:
+            with file_lock(self.lock_path):
+                if os.stat(self.lock_path).st_mtime > triggered_at:
+                    result = 'joined'
+                    print(f"{self.name}: another process finished a build attempt meanwhile, skipping this one")
+                else:
+                    try:
+                        self.run()
+                        result = 'built'
+                    finally:
+                        # Failed attempts count too: waiters join them rather than retrying one by one
+                        finished = time.time()
+                        os.utime(self.lock_path, (finished, finished))
+        except Exception:
+            print(f"{self.name}: build failed")
+            traceback.print_exc()
+        finally:
+            metrics.inc('almosthomers_rebuilds_total', result=result)
+            with self._cond:
+                self._running = False
+                self._flights += 1
+                self.last_result = result
+                self._cond.notify_all()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-writer only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path, shared=False):
+    """Hold an advisory lock on lock_path for the duration of the block
+
+    Writers take the exclusive lock to serialize read-modify-write cycles.
+    Readers don't need it at all because files are replaced atomically.
+    """
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path, data, mode='w', encoding='utf-8'):
+    """Write data to a temp file next to path and rename it into place
+
+    Concurrent readers see either the old or the new contents, never a partial file.
+    """
+    atomic_write_stream(path, [data], mode=mode, encoding=encoding)
+
+
+def atomic_write_stream(path, chunks, mode='w', encoding='utf-8'):
+    """Stream an iterable of chunks into path, replacing it atomically once complete
+
+    Only one chunk is held at a time, and a failure part-way leaves the old file untouched.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
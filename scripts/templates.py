@@ -0,0 +1,80 @@
+"""Precompiled {{ variable }} templates for the HTML components.
+
+Each template is parsed once into alternating literal and placeholder segments
+and cached, so rendering is a single join instead of one full-document
+str.replace scan per variable.
+"""
+import os
+import re
+import warnings
+from functools import lru_cache
+
+COMPONENTS_DIR = "../components"
+PLACEHOLDER_RE = re.compile(r'\{\{ (\w+) \}\}')
+
+_component_cache = {}
+
+
+def load_component(component_name):
+    """Load an HTML component file, re-reading it only when it changes on disk"""
+    component_path = os.path.join(COMPONENTS_DIR, component_name)
+    mtime = os.stat(component_path).st_mtime_ns
+    cached = _component_cache.get(component_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(component_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    _component_cache[component_path] = (mtime, content)
+    return content
+
+
+@lru_cache(maxsize=64)
+def compile_template(template_content):
+    """Split a template into (literals, names) with len(literals) == len(names) + 1"""
+    parts = PLACEHOLDER_RE.split(template_content)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+def iter_render(template_content, **kwargs):
+    """Render a template as a stream of chunks
+
+    Values may be strings, other objects (converted with str) or iterables of
+    string chunks such as section generators, which are streamed through
+    without being joined first. Generators can only be consumed once, so pass
+    them only for placeholders that appear once in the template.
+    """
+    literals, names = compile_template(template_content)
+    check_placeholders(names, kwargs)
+
+    yield literals[0]
+    for name, literal in zip(names, literals[1:]):
+        if name not in kwargs:
+            yield '{{ ' + name + ' }}'
+        else:
+            value = kwargs[name]
+            if isinstance(value, str):
+                yield value
+            elif hasattr(value, '__iter__') and not isinstance(value, (bytes, dict)):
+                yield from value
+            else:
+                yield str(value)
+        yield literal
+
+
+def render_template(template_content, **kwargs):
+    """Simple template rendering with {{ variable }} replacement
+
+    Placeholders without a value are left as-is and reported, as are values
+    that don't match any placeholder.
+    """
+    return ''.join(iter_render(template_content, **kwargs))
+
+
+def check_placeholders(names, values):
+    """Warn about placeholders without values and values without placeholders"""
+    missing = sorted(set(names) - set(values))
+    unused = sorted(set(values) - set(names))
+    if missing:
+        warnings.warn(f"Template placeholders without values: {', '.join(missing)}", stacklevel=2)
+    if unused:
+        warnings.warn(f"Template values without placeholders: {', '.join(unused)}", stacklevel=2)